@@ -0,0 +1,52 @@
+import argparse
+import json
+import sys
+
+from spaceshooter.data_classes.game_classes import SpaceshooterGame
+import spaceshooter.helpers.benchmark_helpers as bh
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Spaceshooter game loop")
+    parser.add_argument("scenarios", nargs="*", default=list(bh.SCENARIOS), help="scenarios to run (default: all)")
+    parser.add_argument("--frames", type=int, default=300, help="frames per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--no-render", action="store_true", help="only time on_loop")
+    parser.add_argument("--output", default="", help="write results to this JSON file")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95 increase over baseline")
+    parser.add_argument("--check-dirty", action="store_true", help="only check that dirty mode patches match the background")
+    args = parser.parse_args()
+
+    game = SpaceshooterGame(headless=True)
+
+    if args.check_dirty:
+        mismatches = bh.check_dirty_render(game, args.frames, args.seed)
+        for frame, npixels in mismatches:
+            print(f"Frame {frame}: {npixels} background pixels differ from a full redraw", file=sys.stderr)
+        print(f"Dirty render check {'failed' if mismatches else 'passed'}")
+        sys.exit(1 if mismatches else 0)
+
+    results = {}
+    for name in args.scenarios:
+        results[name] = bh.run_scenario(game, name, args.frames, args.seed, not args.no_render)
+
+    print(json.dumps(results, indent=4))
+    if args.output:
+        bh.save_json(results, args.output)
+
+    if args.save_baseline:
+        bh.save_json(results, args.baseline)
+        sys.exit(0)
+
+    try:
+        baseline = bh.load_json(args.baseline)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, skipping comparison", file=sys.stderr)
+        sys.exit(0)
+
+    regressions = bh.compare(results, baseline, args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r}", file=sys.stderr)
+
+    sys.exit(1 if regressions else 0)
@@ -1,5 +1,42 @@
+import time
+t0 = time.perf_counter()
+
+import argparse
+import sys
+
 from spaceshooter.data_classes.game_classes import SpaceshooterGame
+from spaceshooter.data_classes.replay_classes import Replay
+from spaceshooter.data_classes.profiler_classes import StartupTimer
 
 if __name__ == "__main__":
-    game = SpaceshooterGame()
-    game.on_execute()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Spaceshooter")
+    parser.add_argument("--headless", action="store_true", help="run the game loop without display or audio as fast as possible")
+    parser.add_argument("--frames", type=int, default=1000, help="number of frames to simulate in headless mode")
+    parser.add_argument("--players", type=int, default=2, choices=[1, 2], help="number of scripted players in headless mode")
+    parser.add_argument("--record", default="", help="record seed and player input of each match to this file")
+    parser.add_argument("--replay", default="", help="replay a recorded match headless as fast as possible and check its state hashes")
+    parser.add_argument("--render", action="store_true", help="also draw every frame when replaying")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay = Replay.load(args.replay)
+        w, h = replay.screen_size
+        game = SpaceshooterGame(screen_width=w, screen_height=h, headless=True)
+        results = game.run_replay(replay, args.render)
+        print(f"Replayed {results['frames']} frames in {results['seconds']:.2f} s ({results['fps']:.0f} fps)")
+        if results["mismatches"]:
+            print(f"State hash mismatch at frames {results['mismatches']}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{results['checked']} state hashes match")
+    elif args.headless:
+        game = SpaceshooterGame(headless=True)
+        game.nplayers = args.players
+        game.record_filepath = args.record
+        results = game.run_headless(args.frames)
+        print(f"Simulated {results['frames']} frames in {results['seconds']:.2f} s ({results['fps']:.0f} fps)")
+    else:
+        game = SpaceshooterGame()
+        game.startup = StartupTimer(t0)
+        game.startup.mark("init")
+        game.record_filepath = args.record
+        game.on_execute()
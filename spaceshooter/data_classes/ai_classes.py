@@ -0,0 +1,88 @@
+"""Definition of enemy AI scheduling classes."""
+import time
+
+import spaceshooter.data_classes.collision_classes as collision
+
+class AiScheduler:
+    """Run enemy decisions at a reduced rate, spread over buckets of ticks.
+
+    Enemies are dealt round robin into tick_rate / rate buckets, and one
+    bucket is due each tick, so every enemy thinks rate times per second.
+    Enemies off screen or further than near_distance from every player
+    only think every far_divisor-th time their bucket comes up. Once a
+    tick's decisions take more than budget seconds, the rest of the bucket
+    waits for its next turn, and goes first then.
+    """
+    def __init__(
+            self,
+            rate: float = 10,
+            near_distance: float = 400,
+            far_divisor: int = 4,
+            budget: float|None = 0.002):
+        """Initialize class."""
+        self.rate = rate
+        self.near_distance = near_distance
+        self.far_divisor = far_divisor
+        self.budget = budget
+
+        self.buckets = [[]]
+        self.tick = 0
+        self.added = 0
+
+        self.thinks = 0
+        self.skipped = 0
+        self.deferred = 0
+        self.last_time = 0.0
+
+    def start(self, tick_rate: int, budget: float|None = 0.002):
+        """Clear buckets for a new match."""
+        self.buckets = [[] for _ in range(max(1, round(tick_rate / self.rate)))]
+        self.budget = budget
+        self.tick = 0
+        self.added = 0
+
+    def add(self, enemy):
+        """Deal enemy into the next bucket."""
+        enemy.ai_visits = 0
+        self.buckets[self.added % len(self.buckets)].append(enemy)
+        self.added += 1
+
+    def update(self, game):
+        """Let the enemies of this tick's bucket think."""
+        t0 = time.perf_counter()
+        bucket = self.buckets[self.tick % len(self.buckets)]
+        self.tick += 1
+
+        bucket[:] = [e for e in bucket if e.alive()]
+        screen = game.screen.get_rect()
+        dt = len(self.buckets) * game.delta_time
+        for ii, enemy in enumerate(bucket):
+            if self.budget is not None and time.perf_counter() - t0 > self.budget:
+                # Rotate deferred enemies to the front for the bucket's next turn
+                self.deferred += len(bucket) - ii
+                bucket[:] = bucket[ii:] + bucket[:ii]
+                break
+
+            target = game.nearest_target(collision.CATEGORY_PLAYER, enemy.position)
+            near = target is not None and screen.colliderect(enemy.rect) and \
+                enemy.position.distance_squared_to(target.position) < self.near_distance ** 2
+
+            enemy.ai_visits += 1
+            if not near and enemy.ai_visits % self.far_divisor != 0:
+                self.skipped += 1
+                continue
+
+            enemy.think(game, target, dt if near else dt * self.far_divisor)
+            self.thinks += 1
+
+        self.last_time = time.perf_counter() - t0
+
+    def stats(self) -> dict:
+        """Return decision counters."""
+        return {
+            "buckets": len(self.buckets),
+            "thinks": self.thinks,
+            "skipped": self.skipped,
+            "deferred": self.deferred,
+            "last_ms": 1000 * self.last_time,
+        }
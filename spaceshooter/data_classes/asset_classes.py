@@ -0,0 +1,399 @@
+"""Definition of shared asset caches."""
+import io
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+import pygame
+
+ROTATION_STEPS = 64
+
+class RotationAtlas:
+    """Image pre-rotated at fixed angle steps with matching collision masks."""
+    def __init__(self, image: pygame.Surface, steps: int = ROTATION_STEPS):
+        """Initialize class."""
+        self.image = image
+        self.steps = max(1, steps)
+
+        self.images = [pygame.transform.rotate(image, 360 * ii / self.steps) for ii in range(self.steps)]
+        self.masks = [pygame.mask.from_surface(im) for im in self.images]
+
+    def index(self, angle: float) -> int:
+        """Return index of frame nearest to angle in radians."""
+        return round(angle * self.steps / (2 * math.pi)) % self.steps
+
+    def frame(self, angle: float) -> Tuple[pygame.Surface, pygame.mask.Mask]:
+        """Return image and mask nearest to angle in radians."""
+        ii = self.index(angle)
+        return self.images[ii], self.masks[ii]
+
+class ImageRegistry:
+    """Cache of decoded, scaled and converted images shared by all sprites.
+
+    Rotation atlases are stored alongside the plain surfaces and share the
+    same eviction order and counters.
+    """
+    def __init__(self, max_size: int = 256):
+        """Initialize class."""
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+        # AssetPreloader to take decoded images from before going to disk
+        self.preloader = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def get(
+            self,
+            path: str,
+            size: Tuple[int, int]|None = None,
+            colorkey: Tuple[int, int, int]|None = None,
+            alpha: bool = False) -> pygame.Surface:
+        """Return shared surface for image at path, loading it on first use."""
+        surface, cached = self.fetch(path, size, colorkey, alpha)
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return surface
+
+    def fetch(self, path, size, colorkey, alpha):
+        """Return surface for image at path and whether it was cached, without counting hits or misses."""
+        key = (path, None if size is None else tuple(size), colorkey, alpha, None)
+
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface, True
+
+        surface = self.load(path, size, colorkey, alpha)
+        self.surfaces[key] = surface
+        self.trim()
+
+        return surface, False
+
+    def trim(self):
+        """Evict least recently used entries beyond max_size."""
+        while len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+
+    def add(
+            self,
+            decoded: pygame.Surface,
+            path: str,
+            size: Tuple[int, int]|None = None,
+            colorkey: Tuple[int, int, int]|None = None,
+            alpha: bool = False) -> pygame.Surface:
+        """Convert an image decoded elsewhere, e.g. on a worker thread, and cache it under path."""
+        key = (path, None if size is None else tuple(size), colorkey, alpha, None)
+
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.prepare(decoded, size, colorkey, alpha)
+            self.surfaces[key] = surface
+        self.surfaces.move_to_end(key)
+        self.trim()
+
+        return surface
+
+    def get_atlas(
+            self,
+            path: str,
+            size: Tuple[int, int]|None = None,
+            colorkey: Tuple[int, int, int]|None = None,
+            steps: int = ROTATION_STEPS,
+            alpha: bool = False) -> RotationAtlas:
+        """Return shared rotation atlas for image at path, building it on first use."""
+        key = (path, None if size is None else tuple(size), colorkey, alpha, steps)
+
+        atlas = self.surfaces.get(key)
+        if atlas is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return atlas
+
+        # One miss for the atlas, whether or not its source image was cached
+        surface, _ = self.fetch(path, size, colorkey, alpha)
+        atlas = RotationAtlas(surface, steps)
+        self.misses += 1
+        self.surfaces[key] = atlas
+        self.trim()
+
+        return atlas
+
+    def load(self, path, size, colorkey, alpha) -> pygame.Surface:
+        """Decode, scale and convert image."""
+        decoded = None if self.preloader is None else self.preloader.image(path)
+        if decoded is None:
+            decoded = pygame.image.load(path)
+
+        return self.prepare(decoded, size, colorkey, alpha)
+
+    def prepare(self, surface, size, colorkey, alpha) -> pygame.Surface:
+        """Convert, scale and colorkey decoded image."""
+        surface = surface.convert_alpha() if alpha else surface.convert()
+
+        if size is not None:
+            surface = pygame.transform.scale(surface, size)
+
+        if colorkey is not None:
+            surface.set_colorkey(colorkey)
+
+        return surface
+
+    def evict(self, path: str):
+        """Remove all cached variants of image at path."""
+        for key in [k for k in self.surfaces if k[0] == path]:
+            del self.surfaces[key]
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all cached images."""
+        self.evictions += len(self.surfaces)
+        self.surfaces.clear()
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        return {
+            "size": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+images = ImageRegistry()
+
+class SoundBank:
+    """Preloaded sound effects played on a fixed pool of mixer channels."""
+    def __init__(self, nchannels: int = 16, volume: float = 1.0):
+        """Initialize class."""
+        self.nchannels = nchannels
+        self.volume = volume
+        self.enabled = True
+
+        # AssetPreloader to take decoded effects from before going to disk
+        self.preloader = None
+
+        self.paths = {}
+        self.min_intervals = {}
+        self.sounds = {}
+        self.last_played = {}
+
+        self.channels = []
+        self.channel_started = []
+
+        self.played = 0
+        self.stolen = 0
+        self.throttled = 0
+
+    def register(self, name: str, path: str, min_interval: float = 0):
+        """Register sound effect with minimum time in seconds between plays."""
+        self.paths[name] = path
+        self.min_intervals[name] = min_interval
+
+    def preload(self):
+        """Decode all registered effects and reserve mixer channels."""
+        if pygame.mixer.get_init() is None:
+            return
+
+        for name, path in self.paths.items():
+            if name not in self.sounds:
+                sound = None if self.preloader is None else self.preloader.sound(path)
+                self.sounds[name] = pygame.mixer.Sound(path) if sound is None else sound
+                self.sounds[name].set_volume(self.volume)
+
+        if not self.channels:
+            if pygame.mixer.get_num_channels() < self.nchannels:
+                pygame.mixer.set_num_channels(self.nchannels)
+            pygame.mixer.set_reserved(self.nchannels)
+            self.channels = [pygame.mixer.Channel(ii) for ii in range(self.nchannels)]
+            self.channel_started = [0] * self.nchannels
+
+    def get_channel(self):
+        """Return index of a free channel, stealing the oldest voice if all are busy."""
+        for ii, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return ii
+
+        ii = min(range(len(self.channels)), key=lambda jj: self.channel_started[jj])
+        self.channels[ii].stop()
+        self.stolen += 1
+        return ii
+
+    def play(self, name: str):
+        """Play sound effect if enabled and not rate limited."""
+        if not self.enabled:
+            return
+
+        sound = self.sounds.get(name)
+        if sound is None or not self.channels:
+            return
+
+        now = pygame.time.get_ticks()
+        last = self.last_played.get(name)
+        if last is not None and now - last < 1000 * self.min_intervals[name]:
+            self.throttled += 1
+            return
+
+        ii = self.get_channel()
+        self.channels[ii].play(sound)
+        self.channel_started[ii] = now
+        self.last_played[name] = now
+        self.played += 1
+
+    def stats(self) -> dict:
+        """Return playback counters."""
+        return {
+            "channels": len(self.channels),
+            "busy": sum(1 for c in self.channels if c.get_busy()),
+            "played": self.played,
+            "stolen": self.stolen,
+            "throttled": self.throttled,
+        }
+
+def get_default_sound_bank():
+    """Generate a sound bank with the default weapon effects."""
+    bank = SoundBank()
+    bank.register("laser", "spaceshooter/Sounds/Weapons/laser.wav", 0.05)
+    bank.register("missile", "spaceshooter/Sounds/Weapons/missile.wav", 0.1)
+    bank.register("boom", "spaceshooter/Sounds/Weapons/BOOM!.wav", 0.1)
+
+    return bank
+
+class AssetPreloader:
+    """Read asset files into memory on a worker thread.
+
+    Files under decode_roots are decoded there as well, images to surfaces
+    and sounds to mixer Sounds, so the image registry and sound bank only
+    have to convert them. Other files, like unused backgrounds and music,
+    are kept as file contents and decoded from memory when asked for.
+    Each asset is handed out once and then dropped, leaving the caching to
+    the image registry and sound bank, and release() drops those nobody
+    asked for. Anything not loaded yet, or already handed out, is left to
+    the caller to load from disk.
+    """
+    image_extensions = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self):
+        """Initialize class."""
+        self.paths = []
+        self.decode = set()
+
+        self.files = {}
+        self.images = {}
+        self.sounds = {}
+
+        # Paths handed out or asked for, which the worker no longer keeps
+        self.taken = set()
+
+        self.thread = None
+        self.stopped = False
+        self.done = 0
+        self.seconds = 0.0
+
+    @property
+    def progress(self) -> float:
+        """Return fraction of files loaded."""
+        return self.done / len(self.paths) if self.paths else 1.0
+
+    @property
+    def finished(self) -> bool:
+        """Return True once all files are loaded or loading was stopped."""
+        return self.done == len(self.paths) or self.stopped
+
+    def start(self, roots: List[str], decode_roots: List[str] = (), decode: List[str] = ()):
+        """Start loading all files under roots, decoding those under decode_roots and in decode."""
+        if self.thread is not None:
+            return
+
+        self.paths = sorted(
+            os.path.join(dirpath, name).replace(os.sep, "/")
+            for root in roots
+            for dirpath, _, names in os.walk(root)
+            for name in names)
+
+        prefixes = tuple(root.rstrip("/") + "/" for root in decode_roots)
+        self.decode = {p for p in self.paths if p.startswith(prefixes)} | set(decode)
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Load files until done or stopped."""
+        t0 = time.perf_counter()
+        for path in self.paths:
+            if self.stopped:
+                break
+
+            if path not in self.taken:
+                with open(path, "rb") as f:
+                    data = f.read()
+
+                if path in self.decode:
+                    self.decode_file(path, data)
+                else:
+                    self.files[path] = data
+
+                # Drop it again if it was taken from disk meanwhile
+                if path in self.taken:
+                    self.files.pop(path, None)
+                    self.images.pop(path, None)
+                    self.sounds.pop(path, None)
+
+            self.done += 1
+
+        self.seconds = time.perf_counter() - t0
+
+    def decode_file(self, path: str, data: bytes):
+        """Decode image or sound file contents."""
+        if path.lower().endswith(self.image_extensions):
+            self.images[path] = pygame.image.load(io.BytesIO(data), path)
+        elif pygame.mixer.get_init() is not None:
+            self.sounds[path] = pygame.mixer.Sound(file=io.BytesIO(data))
+        else:
+            self.files[path] = data
+
+    def open(self, path: str):
+        """Take file object of preloaded file contents, or path if not available."""
+        self.taken.add(path)
+        data = self.files.pop(path, None)
+        return path if data is None else io.BytesIO(data)
+
+    def image(self, path: str) -> pygame.Surface|None:
+        """Take decoded image at path, or None if not available."""
+        surface = self.images.pop(path, None)
+        if surface is None and path in self.files:
+            surface = pygame.image.load(self.open(path), path)
+        self.taken.add(path)
+
+        return surface
+
+    def sound(self, path: str):
+        """Take decoded sound at path, or None if not available."""
+        sound = self.sounds.pop(path, None)
+        if sound is None and path in self.files:
+            sound = pygame.mixer.Sound(file=self.open(path))
+        self.taken.add(path)
+
+        return sound
+
+    def stop(self):
+        """Stop the worker after the current file."""
+        self.stopped = True
+
+    def release(self):
+        """Stop the worker and drop all assets not taken yet."""
+        self.stop()
+        self.taken.update(self.paths)
+        self.files.clear()
+        self.images.clear()
+        self.sounds.clear()
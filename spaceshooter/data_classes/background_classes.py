@@ -0,0 +1,150 @@
+"""Definition of scrolling background classes."""
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+import pygame
+
+import spaceshooter.data_classes.colors as colors
+import spaceshooter.data_classes.asset_classes as assets
+
+class BackgroundLayer:
+    """Horizontally scrolling, tiled background image."""
+    def __init__(
+            self,
+            filepath: str,
+            speed: float = 3,
+            scale_to_screen: bool = False,
+            colorkey: Tuple[int, int, int]|None = None,
+            blend: int = 0):
+        """Initialize class."""
+        self.filepath = filepath
+        self.speed = speed
+        self.scale_to_screen = scale_to_screen
+        self.colorkey = colorkey
+        self.blend = blend
+
+        self.image = None
+        self.x = 0
+
+    def load(self, screen_size, decoded: pygame.Surface|None = None):
+        """Fetch converted image from the image registry, decoding it if needed."""
+        if decoded is None:
+            decoded = assets.images.get(self.filepath)
+
+        size = None
+        if self.scale_to_screen:
+            # Fit screen height, keeping the aspect ratio
+            w, h = decoded.get_size()
+            size = (round(w * screen_size[1] / h), screen_size[1])
+
+        self.image = assets.images.add(decoded, self.filepath, size, self.colorkey)
+
+    def scroll(self, steps: int = 1):
+        """Advance scroll position."""
+        if self.image is None:
+            return
+
+        w = self.image.get_width()
+        self.x = (self.x - self.speed * steps) % w - w
+
+    def draw(self, screen, rect: pygame.Rect|None = None):
+        """Blit the tiles intersecting the viewport, or only rect of it if given."""
+        if self.image is None:
+            return
+
+        view = screen.get_rect() if rect is None else rect.clip(screen.get_rect())
+        w, h = self.image.get_size()
+
+        x = self.x + ((view.left - self.x) // w) * w
+        while x < view.right:
+            y = (view.top // h) * h
+            while y < view.bottom:
+                area = view.clip(pygame.Rect(x, y, w, h))
+                if area.width > 0 and area.height > 0:
+                    screen.blit(self.image, area.topleft, area.move(-x, -y), self.blend)
+                y += h
+            x += w
+
+class Background:
+    """Stack of parallax layers drawn back to front.
+
+    Backgrounds given to prefetch() are decoded on a worker thread, so
+    switch() only has to convert them on the main thread.
+    """
+    def __init__(self, layers: List[BackgroundLayer] = None):
+        """Initialize class."""
+        self.layers = [] if layers is None else layers
+        self.screen_size = None
+
+        self.executor = None
+        self.prefetched = {}
+        self.pending = None
+
+    def load(self, screen_size):
+        """Load all layer images for screen_size."""
+        self.screen_size = screen_size
+        for layer in self.layers:
+            layer.load(screen_size)
+
+    def prefetch(self, filepath: str):
+        """Start decoding image at filepath on a worker thread."""
+        if filepath in self.prefetched:
+            return
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+
+        self.prefetched[filepath] = self.executor.submit(pygame.image.load, filepath)
+
+    def switch(self, filepath: str, layer: int = 0):
+        """Replace image of layer once it has been decoded."""
+        self.prefetch(filepath)
+        self.pending = (filepath, layer)
+
+    def update(self, steps: int = 1):
+        """Apply a pending switch if its image is ready, then scroll all layers."""
+        if self.pending is not None:
+            filepath, ii = self.pending
+            future = self.prefetched[filepath]
+            if future.done():
+                self.pending = None
+                del self.prefetched[filepath]
+
+                layer = self.layers[ii]
+                assets.images.evict(layer.filepath)
+                layer.filepath = filepath
+                layer.load(self.screen_size, future.result())
+
+        for layer in self.layers:
+            layer.scroll(steps)
+
+    def reset(self):
+        """Reset scroll position of all layers."""
+        for layer in self.layers:
+            layer.x = 0
+
+    def draw(self, screen, rect: pygame.Rect|None = None):
+        """Draw all layers, or only rect of them if given."""
+        if not self.layers or self.layers[0].image is None:
+            if rect is None:
+                screen.fill(colors.BLACK)
+            else:
+                screen.fill(colors.BLACK, rect)
+
+        for layer in self.layers:
+            layer.draw(screen, rect)
+
+def get_default_background(filepath: str, speed: float = 3):
+    """Generate a single layer background, or an empty one if filepath is empty."""
+    if filepath == "":
+        return Background()
+
+    return Background([BackgroundLayer(filepath, speed)])
+
+def get_parallax_background(
+        nebula_filepath: str = "spaceshooter/Images/Backgrounds/Blue Nebula 1 - 1024x1024.png",
+        starfield_filepath: str = "spaceshooter/Images/Backgrounds/Starfield 1 - 1024x1024.png"):
+    """Generate a slow nebula layer with a faster starfield on top."""
+    return Background([
+        BackgroundLayer(nebula_filepath, 1),
+        BackgroundLayer(starfield_filepath, 3, blend=pygame.BLEND_RGB_ADD),
+    ])
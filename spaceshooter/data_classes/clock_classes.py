@@ -0,0 +1,46 @@
+"""Definition of simulation clock classes."""
+
+class SimulationClock:
+    """Fixed-step simulation clock.
+
+    Real elapsed time is accumulated and handed out as whole simulation
+    ticks. At most max_ticks are run per rendered frame, the rest of a
+    backlog is dropped so a slow frame can't snowball.
+    """
+    def __init__(self, tick_rate: int = 60, max_ticks: int = 5):
+        """Initialize class."""
+        self.tick_rate = tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+
+        self.ticks = 0
+        self.dropped = 0
+
+    @property
+    def step(self):
+        """Return simulation time step in seconds."""
+        return 1.0 / self.tick_rate
+
+    @property
+    def alpha(self):
+        """Return fraction of a step elapsed since the last tick, for interpolation."""
+        return self.accumulator / self.step
+
+    def advance(self, elapsed: float) -> int:
+        """Add elapsed real time in seconds and return the number of ticks to run."""
+        self.accumulator += elapsed
+
+        n = int(self.accumulator / self.step)
+        if n > self.max_ticks:
+            self.dropped += n - self.max_ticks
+            n = self.max_ticks
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= n * self.step
+
+        self.ticks += n
+        return n
+
+    def reset(self):
+        """Clear accumulated time."""
+        self.accumulator = 0.0
@@ -0,0 +1,252 @@
+"""Definition of collision detection classes."""
+from collections import defaultdict
+from typing import Callable, Iterable
+
+# Collision categories (bit flags)
+CATEGORY_NONE = 0
+CATEGORY_PLAYER = 1
+CATEGORY_ENEMY = 2
+CATEGORY_PLAYER_PROJECTILE = 4
+CATEGORY_ENEMY_PROJECTILE = 8
+
+class CollisionMatrix:
+    """Symmetric table of collision categories that are tested against each other."""
+    def __init__(self, pairs: Iterable = ()):
+        """Initialize class."""
+        self.masks = defaultdict(int)
+        for a, b in pairs:
+            self.enable(a, b)
+
+    def enable(self, a: int, b: int):
+        """Enable collisions between categories a and b."""
+        self.masks[a] |= b
+        self.masks[b] |= a
+
+    def disable(self, a: int, b: int):
+        """Disable collisions between categories a and b."""
+        self.masks[a] &= ~b
+        self.masks[b] &= ~a
+
+    def enabled(self, a: int, b: int) -> bool:
+        """Return True if categories a and b collide."""
+        return bool(self.masks[a] & b)
+
+    def mask(self, category: int) -> int:
+        """Return bitfield of categories colliding with category."""
+        return self.masks[category]
+
+    def pairs(self):
+        """Return list of enabled category pairs, each listed once."""
+        return sorted({(min(a, b), max(a, b)) for a in list(self.masks) for b in list(self.masks) if self.enabled(a, b)})
+
+def get_default_collision_matrix():
+    """Generate the default collision rules."""
+    return CollisionMatrix([
+        (CATEGORY_PLAYER, CATEGORY_ENEMY),
+        (CATEGORY_ENEMY, CATEGORY_ENEMY),
+        (CATEGORY_PLAYER_PROJECTILE, CATEGORY_ENEMY),
+        (CATEGORY_ENEMY_PROJECTILE, CATEGORY_PLAYER),
+    ])
+
+class SpatialHash:
+    """Uniform grid broadphase bucketing sprites by the cells their rect covers."""
+    def __init__(self, cell_size: int = 64):
+        """Initialize class."""
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+
+    def cell_range(self, rect):
+        """Return range of cells covered by rect."""
+        c = self.cell_size
+        return range(rect.left // c, rect.right // c + 1), range(rect.top // c, rect.bottom // c + 1)
+
+    def build(self, sprites: Iterable):
+        """Rebuild grid from sprite rects."""
+        self.cells.clear()
+        for s in sprites:
+            xs, ys = self.cell_range(s.rect)
+            for cx in xs:
+                for cy in ys:
+                    self.cells[(cx, cy)].append(s)
+
+    def query(self, rect):
+        """Return sprites in the cells covered by rect."""
+        found = []
+        seen = set()
+        xs, ys = self.cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                for s in self.cells.get((cx, cy), ()):
+                    if id(s) not in seen:
+                        seen.add(id(s))
+                        found.append(s)
+
+        return found
+
+    def pairs(self):
+        """Yield each pair of sprites sharing at least one cell once."""
+        seen = set()
+        for bucket in self.cells.values():
+            n = len(bucket)
+            for ii in range(n):
+                s1 = bucket[ii]
+                for jj in range(ii + 1, n):
+                    s2 = bucket[jj]
+                    key = (id(s1), id(s2)) if id(s1) < id(s2) else (id(s2), id(s1))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    yield s1, s2
+
+class NeighborGrid:
+    """Uniform grid over sprite positions answering nearest sprite queries.
+
+    nearest() searches rings of cells outward from the query point and
+    stops once no unvisited ring can hold anything closer.
+    """
+    def __init__(self, cell_size: int = 128):
+        """Initialize class."""
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.bounds = None
+
+        # Tick the grid was last built for
+        self.frame = -1
+
+        self.queries = 0
+        self.visited = 0
+
+    def build(self, sprites: Iterable, frame: int = -1):
+        """Rebuild grid from sprite positions."""
+        self.cells.clear()
+        c = self.cell_size
+        for s in sprites:
+            self.cells[(int(s.position[0] // c), int(s.position[1] // c))].append(s)
+
+        if self.cells:
+            xs = [cx for cx, _ in self.cells]
+            ys = [cy for _, cy in self.cells]
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.bounds = None
+
+        self.frame = frame
+
+    def ring(self, cx: int, cy: int, r: int):
+        """Yield buckets of the cells at Chebyshev distance r from cell (cx, cy)."""
+        if r == 0:
+            cells = [(cx, cy)]
+        else:
+            cells = [(x, y) for x in range(cx - r, cx + r + 1) for y in (cy - r, cy + r)]
+            cells += [(x, y) for x in (cx - r, cx + r) for y in range(cy - r + 1, cy + r)]
+
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket:
+                yield bucket
+
+    def nearest(self, x: float, y: float):
+        """Return live sprite nearest to (x, y), or None if the grid is empty."""
+        self.queries += 1
+        if self.bounds is None:
+            return None
+
+        c = self.cell_size
+        cx, cy = int(x // c), int(y // c)
+        x0, y0, x1, y1 = self.bounds
+        rmax = max(cx - x0, x1 - cx, cy - y0, y1 - cy)
+
+        best = None
+        best_d2 = float("inf")
+        for r in range(rmax + 1):
+            for bucket in self.ring(cx, cy, r):
+                for s in bucket:
+                    self.visited += 1
+                    if not s.alive():
+                        continue
+
+                    dx = s.position[0] - x
+                    dy = s.position[1] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2:
+                        best, best_d2 = s, d2
+
+            # Everything beyond ring r is at least r cells away
+            if best is not None and best_d2 <= (r * c) ** 2:
+                break
+
+        return best
+
+class CollisionSystem:
+    """Broadphase plus narrowphase collision detection with per-frame stats."""
+    def __init__(self, cell_size: int = 64, narrowphase: Callable|None = None):
+        """Initialize class."""
+        self.grid = SpatialHash(cell_size)
+        self.narrowphase = narrowphase
+        self.stats_hook = None
+
+        self.stats = {"sprites": 0, "cells": 0, "candidates": 0, "pairs_tested": 0, "collisions": 0}
+
+    @property
+    def cell_size(self):
+        """Return grid cell size."""
+        return self.grid.cell_size
+
+    @cell_size.setter
+    def cell_size(self, value: int):
+        self.grid.cell_size = value
+
+    def candidate_pairs(self, group1, group2):
+        """Yield broadphase candidate pairs between two groups, or within one."""
+        if group1 is group2:
+            self.grid.build(group1)
+            yield from self.grid.pairs()
+            return
+
+        self.grid.build(group2)
+        for s1 in group1:
+            for s2 in self.grid.query(s1.rect):
+                yield s1, s2
+
+    def collide(self, matrix: CollisionMatrix, groups: dict):
+        """Return list of colliding sprite pairs for all enabled category pairs.
+
+        groups maps each collision category to the sprite group holding it.
+        Category pairs disabled in matrix are never looked at.
+        """
+        nsprites = 0
+        candidates = 0
+        tested = 0
+        collisions = []
+        for a, b in matrix.pairs():
+            group1 = groups.get(a)
+            group2 = groups.get(b)
+            if not group1 or not group2:
+                continue
+
+            nsprites += len(group1) + (len(group2) if group2 is not group1 else 0)
+            for s1, s2 in self.candidate_pairs(group1, group2):
+                candidates += 1
+
+                # Per-entity overrides of the category rules
+                if not (s1.collision_category & s2.collision_mask and s2.collision_category & s1.collision_mask):
+                    continue
+
+                if not s1.rect.colliderect(s2.rect):
+                    continue
+
+                tested += 1
+                if self.narrowphase is None or self.narrowphase(s1, s2):
+                    collisions.append((s1, s2))
+
+        self.stats = {
+            "sprites": nsprites,
+            "cells": len(self.grid.cells),
+            "candidates": candidates,
+            "pairs_tested": tested,
+            "collisions": len(collisions),
+        }
+        if self.stats_hook is not None:
+            self.stats_hook(self.stats)
+
+        return collisions
@@ -1,41 +1,44 @@
 """Define ship class."""
 import math
-import numpy as np
+import random
 from pygame.math import Vector2
 from typing import List
 import pygame
 
 import spaceshooter.data_classes.colors as colors
-import spaceshooter.helpers.misc_helpers as mh
+import spaceshooter.data_classes.asset_classes as assets
+import spaceshooter.data_classes.collision_classes as collision
 from spaceshooter.data_classes.parent_classes import PlayerParent
 import spaceshooter.data_classes.weapon_classes as weapons
-import spaceshooter.data_classes.explosion_classes as explosions
 
 class Enemy(PlayerParent):
     """Enemy class."""
+    image_path = "spaceshooter/Images/Enemies/enemy_default.png"
+    collision_shape = "obb"
+    collision_category = collision.CATEGORY_ENEMY
+
+    # Motion settings read by physics.EnemyMotionSystem, linear if None
+    motion = None
+    system = None
+    slot = -1
+
+    # AI: shots attempted per second, laser range, and how close and fast to dodge player projectiles
+    aggression = 0.5
+    fire_range = 500
+    evade_distance = 150
+    evade_speed = 250
+
     def __init__(self, **kwargs):
         """Initialize class."""
         super().__init__(**kwargs)
 
-        self.image0 = pygame.transform.scale(pygame.image.load("spaceshooter/Images/Enemies/enemy_default.png").convert(), (self.width, self.height))
-        self.image0.set_colorkey(colors.WHITE)
-        self.rect = self.image0.get_rect()
-
-        # Set position
-        self.rect.x = self.position[0]
-        self.rect.y = self.position[1]
-
-        self.image, self.rect = mh.rot_center(self.image0, self.angle_deg, self.rect.x, self.rect.y)
+        self.atlas = assets.images.get_atlas(self.image_path, (self.width, self.height), colors.WHITE, self.rotation_steps)
+        self.update_transform()
 
         # Weapons
         self.primary_weapon = weapons.Laser(parent=self)
         self.secondary_weapon = weapons.HomingMissile(parent=self)
 
-    @property
-    def angle_deg(self):
-        """Return angle in degrees."""
-        return 180 * self.angle / math.pi
-
     def move_left(self):
         """Move ship left."""
         self.position[0] = max(0, self.position[0] - self.velocity_max * self.delta_time)
@@ -71,53 +74,78 @@ class Enemy(PlayerParent):
 
         self.parent.add_projectiles(plist)
 
-        v1 = self.velocity
+        # Recoil goes to the motion system, which owns the velocity while registered
         n = Vector2(math.cos(self.angle), -math.sin(self.angle))
-        v2 = v1 - n * momentum / self.mass
-        self.velocity.update(v2)
+        dv = - n * momentum / self.mass
+        self.velocity += dv
+        if self.system is not None:
+            self.system.kick(self, dv)
 
         self.energy -= energy
 
     def update(self):
         """Update sprite location"""
-        self.rect.x = self.position[0]
-        self.rect.y = self.position[1]
+        if self.system is not None:
+            self.system.read(self)
 
-        self.image, self.rect = mh.rot_center(self.image0, self.angle_deg, self.rect.x, self.rect.y)
+        self.update_transform()
 
-        self.update_counters()
+    def think(self, game, target, dt: float):
+        """Aim at target player, fire at it and dodge incoming player projectiles, dt seconds after the last decision."""
+        if target is None:
+            return
+
+        dx = target.rect.centerx - self.position.x
+        dy = target.rect.centery - self.position.y
+        self.angle = math.atan2(-dy, dx) % (2 * math.pi)
+
+        if random.random() < self.aggression * dt:
+            if dx * dx + dy * dy < self.fire_range ** 2:
+                self.fire_primary()
+            else:
+                self.fire_secondary()
+
+        if self.system is None:
+            return
+
+        threat = game.nearest_target(collision.CATEGORY_PLAYER_PROJECTILE, self.position)
+        if threat is None:
+            return
+
+        away = self.position - threat.position
+        if away.length_squared() < self.evade_distance ** 2 and threat.velocity.dot(away) > 0:
+            self.system.evade(self, self.evade_speed if away.y >= 0 else -self.evade_speed)
 
-    def update_counters(self):
-        """Update counters."""
-        if self.primary_weapon is not None:
-            self.primary_weapon.update_counters()
-        
-        if self.secondary_weapon is not None:
-            self.secondary_weapon.update_counters()
-    
     def die(self):
         """Kill the sprite."""
-        exp = explosions.Explosion(self.position.x, self.position.y)
-        self.parent.explosions.add(exp)
+        self.parent.explosions.emit(self.position.x, self.position.y, self.velocity)
         self.kill()
 
+    def kill(self):
+        """Remove sprite from its motion system and all groups."""
+        if self.system is not None:
+            self.system.remove(self)
+
+        super().kill()
+
 class Ufo(Enemy):
     """Ufo enemy."""
+    image_path = "spaceshooter/Images/Enemies/ufo.png"
+    collision_shape = "circle"
+
     def __init__(self, **kwargs):
         """Initialize class."""
         if "angle" not in kwargs:
             kwargs["angle"] = math.pi
 
-        super().__init__(**kwargs)
+        if "radius" not in kwargs:
+            kwargs["radius"] = 0.5 * kwargs.get("width", 30)
 
-        self.image = pygame.transform.scale(pygame.image.load("spaceshooter/Images/Enemies/ufo.png").convert(), (self.width, self.height))
-        self.image.set_colorkey(colors.WHITE)
-        self.rect = self.image.get_rect()
+        super().__init__(**kwargs)
 
     def die(self):
         """Kill the sprite."""
-        exp = explosions.Explosion(self.position.x, self.position.y)
-        self.parent.explosions.add(exp)
+        self.parent.explosions.emit(self.position.x, self.position.y, self.velocity)
         self.kill()
 
 
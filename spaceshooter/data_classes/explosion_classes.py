@@ -1,29 +1,141 @@
+"""Definition of explosion particle classes."""
+from typing import List
+import numpy as np
 import pygame
 
-import spaceshooter.data_classes.colors as colors
-
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self,x,y):
-        pygame.sprite.Sprite.__init__(self)
-        self.images = []
-        for num in range(1,6):
-            image = pygame.image.load(f"spaceshooter/Images/Animations/exp{num}.png")
-            # image.set_colorkey(colors.WHITE)
-            image = pygame.transform.scale(image, (35, 35))
-            self.images.append(image)
-        self.index = 0
-        self.image = self.images[self.index]
-        self.rect = self.image.get_rect()
-        self.rect.center = [x,y]
-        self.counter = 0
-
-    def update(self):
-        explosion_speed = 4
-        self.counter += 1
-        if self.counter >= explosion_speed and self.index < len(self.images) - 1:
-            self.counter = 0
-            self.index += 1
-            self.image = self.images[self.index]
-
-        if self.index >= len(self.images) - 1 and self.counter >= explosion_speed:
-            self.kill()
\ No newline at end of file
+import spaceshooter.data_classes.asset_classes as assets
+
+class ExplosionSystem:
+    """Structure-of-arrays store animating all explosion particles at once.
+
+    Particles are packed at the front of the arrays and dead ones are
+    dropped in the same vectorized pass that moves and ages the rest.
+    All animation frames live side by side on one sprite sheet, so a frame
+    of particles is drawn with one Surface.blits call per batch_size
+    particles.
+    """
+    frame_paths = [f"spaceshooter/Images/Animations/exp{num}.png" for num in range(1, 6)]
+    frame_size = (35, 35)
+
+    # Seconds per animation frame
+    frame_time = 4 / 30
+
+    # Fraction of the dying sprite's velocity the explosion keeps
+    inherit_velocity = 0.25
+
+    batch_size = 512
+
+    def __init__(self, capacity: int = 256):
+        """Initialize class."""
+        self.capacity = 0
+        self.count = 0
+        self.position = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.age = np.zeros(0)
+        self.frame = np.zeros(0, dtype=int)
+
+        self.sheet = None
+        self.areas = []
+
+        self.emitted = 0
+        self.draw_calls = 0
+
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nframes(self):
+        """Return number of animation frames."""
+        return len(self.frame_paths)
+
+    def grow(self, capacity: int):
+        """Grow arrays to hold capacity particles."""
+        n = capacity - self.capacity
+        if n <= 0:
+            return
+
+        self.position = np.concatenate([self.position, np.zeros((n, 2))])
+        self.velocity = np.concatenate([self.velocity, np.zeros((n, 2))])
+        self.age = np.concatenate([self.age, np.zeros(n)])
+        self.frame = np.concatenate([self.frame, np.zeros(n, dtype=int)])
+        self.capacity = capacity
+
+    def load(self):
+        """Build sprite sheet from the animation frames."""
+        w, h = self.frame_size
+        self.sheet = pygame.Surface((w * self.nframes, h), pygame.SRCALPHA).convert_alpha()
+        self.sheet.fill((0, 0, 0, 0))
+        self.areas = []
+        for ii, path in enumerate(self.frame_paths):
+            self.sheet.blit(assets.images.get(path, self.frame_size, alpha=True), (ii * w, 0))
+            self.areas.append(pygame.Rect(ii * w, 0, w, h))
+
+    def emit(self, x: float, y: float, velocity=(0, 0)):
+        """Start an explosion centered at x, y, drifting with part of velocity."""
+        if self.count == self.capacity:
+            self.grow(max(1, 2 * self.capacity))
+
+        ii = self.count
+        self.position[ii] = (x, y)
+        self.velocity[ii] = velocity
+        self.velocity[ii] *= self.inherit_velocity
+        self.age[ii] = 0
+        self.frame[ii] = 0
+        self.count += 1
+        self.emitted += 1
+
+    def update(self, dt: float):
+        """Move and age all particles, dropping those past their last frame."""
+        n = self.count
+        if n == 0:
+            return
+
+        self.position[:n] += self.velocity[:n] * dt
+        self.age[:n] += dt
+        self.frame[:n] = (self.age[:n] / self.frame_time).astype(int)
+
+        keep = self.frame[:n] < self.nframes
+        m = int(keep.sum())
+        if m < n:
+            for array in (self.position, self.velocity, self.age, self.frame):
+                array[:m] = array[:n][keep]
+            self.count = m
+
+    def topleft(self) -> List[tuple]:
+        """Return integer top left corners of all particles."""
+        w, h = self.frame_size
+        corners = (self.position[:self.count] - (w / 2, h / 2)).astype(int)
+        return list(map(tuple, corners.tolist()))
+
+    def rects(self) -> List[pygame.Rect]:
+        """Return screen rects covered by particles."""
+        return [pygame.Rect(xy, self.frame_size) for xy in self.topleft()]
+
+    def draw(self, surface: pygame.Surface):
+        """Blit all particles from the sprite sheet in batches."""
+        if self.count == 0:
+            return
+
+        if self.sheet is None:
+            self.load()
+
+        areas = self.areas
+        sequence = [(self.sheet, xy, areas[f]) for xy, f in zip(self.topleft(), self.frame[:self.count].tolist())]
+        for ii in range(0, len(sequence), self.batch_size):
+            surface.blits(sequence[ii:ii + self.batch_size], doreturn=False)
+            self.draw_calls += 1
+
+    def clear(self):
+        """Remove all particles."""
+        self.count = 0
+
+    def stats(self) -> dict:
+        """Return particle counters."""
+        return {
+            "particles": self.count,
+            "capacity": self.capacity,
+            "emitted": self.emitted,
+            "draw_calls": self.draw_calls,
+        }
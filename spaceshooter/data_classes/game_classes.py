@@ -1,15 +1,28 @@
 """Definition for game classes."""
+import math
+import os
+import time
 import pygame
-import pygame_menu
 import random
 
 import spaceshooter.data_classes.colors as colors
+import spaceshooter.data_classes.asset_classes as assets
+import spaceshooter.data_classes.collision_classes as collision
+import spaceshooter.data_classes.background_classes as backgrounds
+import spaceshooter.data_classes.physics_classes as physics
+import spaceshooter.data_classes.explosion_classes as explosions
 import spaceshooter.helpers.misc_helpers as mh
 from spaceshooter.data_classes.ship_classes import get_default_ship
 from spaceshooter.data_classes.enemy_classes import get_default_enemy
-from spaceshooter.data_classes.projectile_classes import ProjectileParent
-from spaceshooter.data_classes.ship_classes import Ship
-from spaceshooter.data_classes.parent_classes import PlayerParent
+from spaceshooter.data_classes.parent_classes import PlayerParent, MovableSprite
+from spaceshooter.data_classes.profiler_classes import FrameProfiler, StartupTimer
+from spaceshooter.data_classes.hud_classes import Hud
+from spaceshooter.data_classes.render_classes import DirtyRectTracker
+from spaceshooter.data_classes.clock_classes import SimulationClock
+from spaceshooter.data_classes.replay_classes import InputRecorder
+from spaceshooter.data_classes.spawn_classes import SpawnScheduler, get_default_waves
+from spaceshooter.data_classes.ai_classes import AiScheduler
+from spaceshooter.data_classes.timer_classes import TimerWheel
 
 class SpaceshooterGame:
     """Spaceshooter game class."""
@@ -19,39 +32,168 @@ class SpaceshooterGame:
             screen_height: int = 600,
             screen_width: int = 800,
             background_filepath: str = "spaceshooter/Images/Backgrounds/Blue Nebula 1 - 1024x1024.png",
-            fps: int = 30):
+            fps: int = 30,
+            tick_rate: int = 60,
+            collision_cell_size: int = 64,
+            headless: bool = False,
+            render_mode: str = "flip"):
         """Initialize class."""
         self.name = name
         self.screen_height = screen_height
         self.screen_width = screen_width
         self.background_filepath = background_filepath
         self.fps = fps
+        self.tick_rate = tick_rate
         self.score = 0
         self.text_color = colors.WHITE
         self.text_color_background = colors.BLACK
         
-        self.background_image = None
+        # Nebula under a faster starfield. During a match the nebula moves on to the next of
+        # background_filepaths every background_interval seconds, decoded ahead on a worker thread.
+        if background_filepath:
+            self.background = backgrounds.get_parallax_background(background_filepath)
+        else:
+            self.background = backgrounds.get_default_background("")
+        self.background_filepaths = [
+            background_filepath,
+            "spaceshooter/Images/Backgrounds/Purple Nebula 1 - 1024x1024.png",
+            "spaceshooter/Images/Backgrounds/Green Nebula 1 - 1024x1024.png",
+        ]
+        self.background_interval = 60
+        self.background_index = 0
         self.screen = None
         self.isrunning = False
         self.isquitting = False
 
+        # Headless mode runs without a real display, audio or music
+        self.headless = headless
+
+        # Callable (game, player) returning key states in place of pygame.key.get_pressed()
+        self.input_provider = None
+        self.frame = 0
+
+        # Seed of the current match, and input recording written on reset if record_filepath is set
+        self.seed = None
+        self.record_filepath = ""
+        self.recorder = None
+
+        # Players whose weapon level cheat is applied next tick
+        self.cycle_requests = set()
+
+        # Per-phase frame timing, overlay toggled with F3 and cProfile capture with F4
+        self.profiler = FrameProfiler()
+        self.profile_nframes = 300
+
+        self.hud = Hud(color=self.text_color)
+
+        # "flip" redraws the full screen every frame, "dirty" only the regions sprites touched
+        self.render_mode = render_mode
+        self.dirty_rects = DirtyRectTracker()
+        self.dirty_scroll_interval = 10
+
         self.nplayers = 1
+        self.nenemies = 3
         self.enemy_rate = 0.5
 
+        # Wave timeline, defaulting to get_default_waves(enemy_rate). Spawns are held back while the last
+        # frame's work (events, ticks and drawing, not the fps wait) took more than spawn_budget of the
+        # 1 / fps frame period, i.e. while the game cannot keep its frame rate, not just because it is busy.
+        self.waves = None
+        self.spawner = SpawnScheduler()
+        self.spawn_budget = 0.8
+        self.frame_time = 0.0
+
+        # Lifetimes, cooldowns, retargeting and off-screen culling run as timers on simulation ticks.
+        # Sprites further than cull_margin pixels off screen are killed.
+        self.timers = TimerWheel(tick_rate)
+        self.cull_margin = 200
+        self.cull_interval = 1
+
+        # Enemy decisions, staggered over ticks and limited to ai_budget seconds per tick
+        self.ai = AiScheduler()
+        self.ai_budget = 0.002
+
+        # Ignore the spawn and AI budgets, which depend on wall-clock time, so a seeded match plays out identically
+        self.deterministic = False
+
+        # Player ships of the current match, including those out of lives
+        self.ships = []
+
+        # Times to menu and first frame, printed once the first frame is drawn
+        self.startup = StartupTimer()
+
         self.clock = pygame.time.Clock()
 
-        self.sound_on = True
+        # Simulation runs at tick_rate independent of the rendered fps
+        self.sim_clock = SimulationClock(tick_rate)
+        self.interpolate = True
+        self.previous_centers = {}
+        self.render_frame = 0
+
+        self.sounds = assets.get_default_sound_bank()
+
+        # Assets are read on a worker thread while the menu shows, decoding those under decode_roots
+        self.asset_roots = ["spaceshooter/Images", "spaceshooter/Sounds"]
+        self.decode_roots = [
+            "spaceshooter/Images/Animations",
+            "spaceshooter/Images/Enemies",
+            "spaceshooter/Images/Projectiles",
+            "spaceshooter/Images/Ships",
+            "spaceshooter/Sounds/Weapons",
+        ]
+        self.preloader = assets.AssetPreloader()
+        assets.images.preloader = self.preloader
+        self.sounds.preloader = self.preloader
+        self.loading_label = None
 
         self.all_sprites = pygame.sprite.Group()
         self.players = pygame.sprite.Group()
         self.enemies = pygame.sprite.Group()
         self.projectiles = pygame.sprite.Group()
-        self.explosions = pygame.sprite.Group()
+        self.player_projectiles = pygame.sprite.Group()
+        self.enemy_projectiles = pygame.sprite.Group()
+
+        # Batched projectile physics, one system per projectile class, and batched enemy motion
+        self.projectile_systems = {}
+        self.enemy_motion = physics.EnemyMotionSystem()
+
+        # Explosion particles, drawn from one sprite sheet
+        self.explosions = explosions.ExplosionSystem()
+
+        self.collisions = collision.CollisionSystem(collision_cell_size, mh.collide_if_not_self)
+        self.collision_matrix = collision.get_default_collision_matrix()
+        self.collision_groups = {
+            collision.CATEGORY_PLAYER: self.players,
+            collision.CATEGORY_ENEMY: self.enemies,
+            collision.CATEGORY_PLAYER_PROJECTILE: self.player_projectiles,
+            collision.CATEGORY_ENEMY_PROJECTILE: self.enemy_projectiles,
+        }
+
+        # Nearest neighbour indexes for missile targeting, rebuilt at most once per tick
+        self.target_indexes = {
+            collision.CATEGORY_PLAYER: collision.NeighborGrid(),
+            collision.CATEGORY_ENEMY: collision.NeighborGrid(),
+            collision.CATEGORY_PLAYER_PROJECTILE: collision.NeighborGrid(),
+        }
 
         self.reset()
 
         self.on_init()
 
+    @property
+    def sound_on(self):
+        """Return True if sound effects are enabled."""
+        return self.sounds.enabled
+
+    @sound_on.setter
+    def sound_on(self, value: bool):
+        self.sounds.enabled = value
+
+    @property
+    def delta_time(self):
+        """Return simulation time step."""
+        return 1.0 if self.tick_rate == 0 else 1.0 / self.tick_rate
+
     @property
     def screen_size(self):
         """Return screen size."""
@@ -59,21 +201,33 @@ class SpaceshooterGame:
     
     def get_background_image(self):
         """Return background as image."""
-        if self.background_filepath == "":
+        if not self.background.layers:
             return None
         
-        return self.background_image if self.background_image is not None else pygame.image.load(self.background_filepath).convert()
+        return self.background.layers[0].image
 
     def on_init(self):
         """Initialize game."""
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+
         pygame.init()
       
         # Set up the game window    
-        self.screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN, pygame.HWSURFACE | pygame.DOUBLEBUF)
+        if self.headless:
+            self.screen = pygame.display.set_mode(self.screen_size)
+        else:
+            self.screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN, pygame.HWSURFACE | pygame.DOUBLEBUF)
         pygame.display.set_caption(self.name)
 
         self.screen_width = self.screen.get_width()
         self.screen_height = self.screen.get_height()
+
+        self.background.load(self.screen_size)
+
+        if self.headless:
+            self.sound_on = False
  
     def on_event(self, event):
         # Handle events
@@ -84,128 +238,219 @@ class SpaceshooterGame:
             if event.key == pygame.K_ESCAPE:
                 self.isrunning = False
             elif event.key == pygame.K_o:
-                self.players.sprites()[0].cycle_level()
+                if len(self.ships) > 0 and self.ships[0].alive():
+                    self.cycle_requests.add(self.ships[0])
             elif event.key == pygame.K_p:
-                if self.nplayers == 2:
-                    self.players.sprites()[1].cycle_level()
+                if len(self.ships) > 1 and self.ships[1].alive():
+                    self.cycle_requests.add(self.ships[1])
             elif event.key == pygame.K_m:
                 self.sound_on = not self.sound_on
+            elif event.key == pygame.K_F3:
+                self.profiler.show_overlay = not self.profiler.show_overlay
+            elif event.key == pygame.K_F4:
+                self.profiler.start_capture(self.profile_nframes)
         
     def on_loop(self):
         """Update game."""
 
+        self.frame += 1
+        self.gametime += self.delta_time
+        prof = self.profiler
+
+        # Remember positions for render interpolation
+        if self.interpolate:
+            self.previous_centers = {s: s.rect.center for s in self.all_sprites}
+
         # Handle key press
-        for player in self.players:
-            player.key_press()
+        with prof.phase("input"):
+            for player in self.players:
+                keys = pygame.key.get_pressed() if self.input_provider is None else self.input_provider(self, player)
+
+                cycle_level = player in self.cycle_requests
+                if cycle_level:
+                    player.cycle_level()
+
+                player.key_press(keys)
+
+                if self.recorder is not None:
+                    self.recorder.record(player, keys, cycle_level)
+            self.cycle_requests.clear()
+
+        # Enemy decisions
+        with prof.phase("ai"):
+            self.ai.update(self)
 
         # Handle movement
-        self.all_sprites.update()
+        with prof.phase("update"):
+            MovableSprite.transform_rebuilds = 0
+            MovableSprite.transform_skips = 0
 
-        # Kill sprites outside window
-        g = 200
-        for s in self.all_sprites:
-            r = s.rect
-            if r.right < -g or r.bottom < -g or r.left > self.screen_width + g or r.top > self.screen_height + g:
-                s.kill()
+            for system in self.projectile_systems.values():
+                system.step(self.delta_time)
+            self.enemy_motion.step(self.delta_time)
+            self.all_sprites.update()
 
-        # Handle collisions
-        G = pygame.sprite.Group(self.all_sprites.copy())
-        for sprite1 in G:
-            G.remove(sprite1)
-            sprite2s = pygame.sprite.spritecollide(sprite1, G, False, mh.collide_if_not_self)
-            if not sprite2s:
-                continue
-            for sprite2 in sprite2s:
-                if isinstance(sprite1, ProjectileParent) and isinstance(sprite2, ProjectileParent):
-                    continue
+            self.transform_stats = {
+                "rebuilds": MovableSprite.transform_rebuilds,
+                "skips": MovableSprite.transform_skips,
+            }
 
-                if isinstance(sprite1, Ship) and isinstance(sprite2, Ship):
-                    continue
+        # Expire timers, which also kills sprites outside window
+        with prof.phase("timers"):
+            self.timers.advance()
 
-                if isinstance(sprite1, ProjectileParent) and isinstance(sprite2, Ship):
-                    continue
+        with prof.phase("explosions"):
+            self.explosions.update(self.delta_time)
 
-                if isinstance(sprite1, Ship) and isinstance(sprite2, ProjectileParent):
+        # Handle collisions
+        with prof.phase("collide"):
+            for sprite1, sprite2 in self.collisions.collide(self.collision_matrix, self.collision_groups):
+                # Skip sprites killed by an earlier collision this frame
+                if not sprite1.alive() or not sprite2.alive():
                     continue
 
                 # print(f"Collision detected between sprites {sprite1.name} and {sprite2.name}")
-                if isinstance(sprite1, ProjectileParent):
-                    sprite1.parent.parent.score += 1
-                sprite1.die()
-
-                if isinstance(sprite2, ProjectileParent):
-                    sprite2.parent.parent.score += 1
-                sprite2.die()
-
-    def on_render(self):
-        """Draw screen.""" 
-        bg = self.get_background_image()
-        bg_w = bg.get_width()
-        if bg is None:
-            self.screen.fill(colors.BLACK)
-        else:
-            self.screen.blit(bg, (self.bg_x, 0))
-            self.screen.blit(bg, (self.bg_x + bg_w, 0))
-            self.screen.blit(bg, (self.bg_x + 2 * bg_w, 0))
+                for s in (sprite1, sprite2):
+                    if s.collision_category == collision.CATEGORY_PLAYER_PROJECTILE:
+                        s.parent.parent.score += 1
+                    s.die()
+
+        if self.recorder is not None:
+            self.recorder.end_frame(self)
+
+    def on_render(self, alpha: float = 1.0):
+        """Draw screen, interpolating sprites alpha of a tick past the previous one.""" 
+        prof = self.profiler
+        screen_area = self.screen_width * self.screen_height
+        self.render_frame += 1
+
+        # In dirty mode the background scrolls in coarse steps, before drawing, so each step frame is a full redraw at the new offset
+        step = self.render_mode == "dirty" and self.render_frame % self.dirty_scroll_interval == 0
+        if step:
+            self.background.update(self.dirty_scroll_interval)
+
+        moved = self.interpolate_sprites(alpha)
+
+        rects = [s.rect.copy() for s in self.all_sprites] + self.explosions.rects()
+        hud_rect = pygame.Rect(0, 0, self.screen_width, self.hud.get_font().get_linesize())
+
+        dirty = None
+        if self.render_mode == "dirty" and not step:
+            dirty = self.dirty_rects.collect(rects + [hud_rect], screen_area)
+
+        with prof.phase("background"):
+            if dirty is None:
+                self.background.draw(self.screen)
+            else:
+                for r in self.dirty_rects.previous + [hud_rect]:
+                    self.background.draw(self.screen, r)
 
         # Draw all sprites
-        self.all_sprites.draw(self.screen)
-        self.explosions.draw(self.screen)
-        self.explosions.update()
+        with prof.phase("sprites"):
+            self.all_sprites.draw(self.screen)
+            self.explosions.draw(self.screen)
 
-        self.clock.tick()
-        self.gametime += self.clock.get_time() / 1000.0
-        
         # Draw status text
-        font = pygame.font.Font('freesansbold.ttf', 32)
+        with prof.phase("hud"):
+            self.update_hud()
+            self.hud.draw(self.screen)
+
+        if prof.show_overlay:
+            overlay_rect = prof.draw_overlay(self.screen, {
+                "players": len(self.players),
+                "enemies": len(self.enemies),
+                "projectiles": len(self.projectiles),
+                "explosions": len(self.explosions),
+                "transforms skipped": self.transform_stats["skips"],
+                "ai thinks": self.ai.thinks,
+            })
+            rects.append(overlay_rect)
+            if dirty is not None:
+                dirty.append(overlay_rect)
+
+        with prof.phase("flip"):
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+
+        self.dirty_rects.commit(rects)
+
+        for s, center in moved:
+            s.rect.center = center
+
+        # Update background position
+        if self.render_mode != "dirty":
+            self.background.update()
+
+    def check_bounds(self, sprite):
+        """Kill sprite if it is cull_margin pixels off screen, otherwise check again when it could be."""
+        r = sprite.rect
+        g = self.cull_margin
+        room = min(r.right + g, r.bottom + g, self.screen_width + g - r.left, self.screen_height + g - r.top)
+        if room < 0:
+            sprite.kill()
+            return
+
+        speed = max(1, sprite.velocity.length())
+        sprite.schedule(self.timers, min(self.cull_interval, room / speed), self.check_bounds, sprite)
+
+    def nearest_target(self, category: int, position):
+        """Return sprite of category nearest to position, building its index on the first query of a tick."""
+        index = self.target_indexes[category]
+        if index.frame != self.frame:
+            index.build(self.collision_groups[category], self.frame)
+
+        return index.nearest(position[0], position[1])
+
+    def interpolate_sprites(self, alpha: float):
+        """Move sprite rects between their previous and current tick, return moved sprites with their true centers."""
+        moved = []
+        if not self.interpolate or alpha >= 1:
+            return moved
+
+        for s, (x0, y0) in self.previous_centers.items():
+            if not s.alive():
+                continue
+
+            x1, y1 = s.rect.center
+            if x0 != x1 or y0 != y1:
+                moved.append((s, (x1, y1)))
+                s.rect.center = (round(x0 + alpha * (x1 - x0)), round(y0 + alpha * (y1 - y0)))
+
+        return moved
+
+    def update_hud(self):
+        """Update status text."""
+        w = self.screen_width
 
         # Player 1
-        p = self.players.sprites()[0]
-        text = font.render(f"Score: {p.score}", True, self.text_color)
-        textRect = text.get_rect()
-        textRect.left = 0
-        textRect.top = 0
-        self.screen.blit(text, textRect)
-
-        text = font.render(f"Lives: {p.lives}", True, self.text_color)
-        textRect = text.get_rect()
-        textRect.centerx = self.screen_width // 4
-        textRect.top = 0
-        self.screen.blit(text, textRect)
+        if len(self.ships) > 0:
+            p = self.ships[0]
+            self.hud.set_label("score1", f"Score: {p.score}", "left", 0)
+            self.hud.set_label("lives1", f"Lives: {p.lives}", "centerx", w // 4)
 
         # Player 2
-        if self.nplayers == 2:
-            p = self.players.sprites()[1]
-            text = font.render(f"Score: {p.score}", True, self.text_color)
-            textRect = text.get_rect()
-            textRect.right = self.screen_width
-            textRect.top = 0
-            self.screen.blit(text, textRect)
-        
-            text = font.render(f"Lives: {p.lives}", True, self.text_color)
-            textRect = text.get_rect()
-            textRect.centerx = self.screen_width - self.screen_width // 4
-            textRect.top = 0
-            self.screen.blit(text, textRect)
+        if len(self.ships) > 1:
+            p = self.ships[1]
+            self.hud.set_label("score2", f"Score: {p.score}", "right", w)
+            self.hud.set_label("lives2", f"Lives: {p.lives}", "centerx", w - w // 4)
+        else:
+            self.hud.remove_label("score2")
+            self.hud.remove_label("lives2")
 
         # Game time
-        text = font.render(f"Time: {int(self.gametime)}", True, self.text_color)
-        textRect = text.get_rect()
-        textRect.centerx = self.screen_width // 2 
-        textRect.top = 0
-        self.screen.blit(text, textRect)
-
-        pygame.display.flip()
-
-        # Update background position
-        self.bg_x -= self.bg_dx
-        if self.bg_x < -bg_w:
-            self.bg_x = 0
+        self.hud.set_label("time", f"Time: {int(self.gametime)}", "centerx", w // 2)
 
     def on_cleanup(self):
         pygame.quit()
  
     def on_execute(self):
+        # Only the interactive game needs the menu library
+        import pygame_menu
+
+        self.preloader.start(self.asset_roots, self.decode_roots, [l.filepath for l in self.background.layers])
+
         # Show menu
         menu = pygame_menu.Menu('Welcome', 400, 300,
                        theme=pygame_menu.themes.THEME_BLUE)
@@ -213,98 +458,287 @@ class SpaceshooterGame:
         menu.add.button('Play', self.on_start)
         menu.add.selector('Players :', [('ONE', 1), ('TWO', 2)], onchange=self.set_nplayers)
         menu.add.button('Quit', pygame_menu.events.EXIT)
+        self.loading_label = menu.add.label("Loading 0%", font_size=20)
 
         while not self.isquitting:
-            pygame.mixer.music.load("spaceshooter/Sounds/Music/spaceshooter_theme_1.wav")
-            pygame.mixer.music.set_volume(0.5)
-            pygame.mixer.music.play(-1)
+            self.play_music("spaceshooter/Sounds/Music/spaceshooter_theme_1.wav", 0.5)
+
+            menu.mainloop(self.screen, self.on_menu_frame)
 
-            menu.mainloop(self.screen)
+    def on_menu_frame(self):
+        """Show asset loading progress while the menu runs."""
+        self.startup.mark("menu")
+
+        text = "Ready" if self.preloader.finished else f"Loading {100 * self.preloader.progress:.0f}%"
+        if self.loading_label.get_title() != text:
+            self.loading_label.set_title(text)
+            if self.preloader.finished:
+                self.startup.mark("assets")
+
+    def play_music(self, filepath: str, volume: float|None = None):
+        """Loop music track, unless running headless."""
+        if self.headless:
+            return
+
+        pygame.mixer.music.load(self.preloader.open(filepath), os.path.splitext(filepath)[1][1:])
+        if volume is not None:
+            pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)
+
+    def fadeout_music(self, ms: int = 1000):
+        """Fade out music, unless running headless."""
+        if not self.headless:
+            pygame.mixer.music.fadeout(ms)
 
     def set_nplayers(self, value, nplayers):
         self.nplayers = nplayers
 
     def on_start(self):
         # Run the game
-        if self.on_init() == False:
-            self.isrunning = False
+        self.startup.mark("play")
 
-        pygame.mixer.music.fadeout(1000)
+        # The display is set up once in __init__, only set it up again after on_cleanup
+        if not pygame.display.get_init():
+            self.on_init()
 
-        # Create players
-        for ii in range(self.nplayers):
-            ship = get_default_ship(ii + 1)
-            ship.position.update(50, (ii + 1) * self.screen_height // (self.nplayers + 1))
-            self.add_player(ship)
+        if not self.headless:
+            self.sounds.preload()
 
-        # Create enemies
-        nenemies = 3
-        for ii in range(nenemies):
-            enemy = get_default_enemy("Ufo", [self.screen_width - 100, (ii + 1) * self.screen_height // (nenemies + 1)])
-            self.add_enemy(enemy)
+        if self.explosions.sheet is None:
+            self.explosions.load()
 
-        self.isrunning = True
+        # Loading a track waits for a fadeout to finish, so switch to the game music directly
+        self.start_match()
 
-        pygame.mixer.music.load("spaceshooter/Sounds/Music/spaceshooter_theme_4.wav")
-        pygame.mixer.music.play(-1)
+        self.play_music("spaceshooter/Sounds/Music/spaceshooter_theme_4.wav")
+
+        # The match has taken what it needs, the rest is loaded from disk if ever used
+        self.preloader.release()
  
         # Main loop
-        clock = pygame.time.Clock()
-        enemy_countdown = 1 / self.enemy_rate
+        self.clock.tick()
+        self.sim_clock.reset()
         while self.isrunning:
+            frame_start = time.perf_counter()
+
             # Handle events
             for event in pygame.event.get():
                 self.on_event(event)
-                
-            enemy_countdown -= 1 / self.fps
-            if enemy_countdown < 0:
-                enemy_countdown = 1 / self.enemy_rate
-                enemy = get_default_enemy("Ufo", [self.screen_width - 100, random.randint(100, self.screen_height - 100)])
-                enemy.velocity.x = -100
-                self.add_enemy(enemy)
-
-            # Game mechanics
-            self.on_loop()
+
+            # Game mechanics, in fixed steps
+            for _ in range(self.sim_clock.advance(self.clock.get_time() / 1000.0)):
+                self.spawn_enemies()
+                self.on_loop()
+
+            # Game over once all ships are out of lives
+            if len(self.players) == 0:
+                self.isrunning = False
 
             # Drawing
-            self.on_render()
+            self.on_render(self.sim_clock.alpha)
+
+            if "first frame" not in self.startup.marks:
+                self.startup.mark("first frame")
+                print(f"Startup: {self.startup.report()} "
+                      f"({1000 * self.startup.since('play', 'first frame'):.0f} ms after play)")
+
+            self.profiler.end_frame()
+            self.frame_time = time.perf_counter() - frame_start
 
             # Limit to fps
-            clock.tick(self.fps)
+            self.clock.tick(self.fps)
 
-        pygame.mixer.music.fadeout(1000)
+        self.fadeout_music()
 
         self.reset()
 
-        pygame.mixer.music.load("spaceshooter/Sounds/Music/spaceshooter_theme_1.wav")
-        pygame.mixer.music.play(-1)
+        self.play_music("spaceshooter/Sounds/Music/spaceshooter_theme_1.wav")
         # self.on_cleanup()
 
+    def start_match(self, seed: int|None = None):
+        """Seed the random generator, then create players and initial enemies."""
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        random.seed(self.seed)
+
+        # Create players
+        for ii in range(self.nplayers):
+            ship = get_default_ship(ii + 1)
+            ship.position.update(50, (ii + 1) * self.screen_height // (self.nplayers + 1))
+            ship.spawn_position.update(ship.position)
+            self.add_player(ship)
+        self.ships = self.players.sprites()
+
+        budget = None if self.deterministic or self.record_filepath else self.ai_budget
+        self.ai.start(self.tick_rate, budget)
+
+        # Create enemies
+        for ii in range(self.nenemies):
+            enemy = get_default_enemy("Ufo", [self.screen_width - 100, (ii + 1) * self.screen_height // (self.nenemies + 1)])
+            self.add_enemy(enemy)
+
+        self.isrunning = True
+        self.timers.tick_rate = self.tick_rate
+
+        waves = get_default_waves(self.enemy_rate) if self.waves is None else self.waves
+        budget = None if self.deterministic or self.record_filepath else self.spawn_budget / self.fps
+        self.spawner.start(waves, budget)
+
+        if self.record_filepath:
+            self.recorder = InputRecorder(self, self.seed)
+
+        # Headless runs rarely draw, so they keep the first nebula
+        if not self.headless and self.background.layers:
+            self.background.prefetch(self.background_filepaths[1 % len(self.background_filepaths)])
+            self.timers.schedule(self.background_interval, self.next_background)
+
+    def next_background(self):
+        """Switch to the next nebula once decoded, prefetch the one after and schedule the following switch."""
+        n = len(self.background_filepaths)
+        self.background_index = (self.background_index + 1) % n
+        self.background.switch(self.background_filepaths[self.background_index])
+        self.background.prefetch(self.background_filepaths[(self.background_index + 1) % n])
+        self.timers.schedule(self.background_interval, self.next_background)
+
+    def spawn_enemies(self):
+        """Spawn enemies due on the wave timeline."""
+        with self.profiler.phase("spawn"):
+            self.spawner.update(self, self.frame_time)
+
+    def run_headless(self, nframes: int = 1000, input_provider=None, render: bool = False) -> dict:
+        """Run a match for nframes as fast as possible and return timing results.
+
+        input_provider replaces keyboard input for the players, defaulting
+        to mh.scripted_input. The display is only drawn if render is True.
+        """
+        self.input_provider = mh.scripted_input if input_provider is None else input_provider
+        self.start_match()
+
+        t0 = time.perf_counter()
+        for _ in range(nframes):
+            frame_start = time.perf_counter()
+
+            pygame.event.pump()
+            self.spawn_enemies()
+            self.on_loop()
+
+            if render:
+                self.on_render()
+
+            self.profiler.end_frame()
+            self.frame_time = time.perf_counter() - frame_start
+        seconds = time.perf_counter() - t0
+
+        results = {
+            "frames": nframes,
+            "seconds": seconds,
+            "fps": nframes / seconds if seconds > 0 else float("inf"),
+            "sprites": len(self.all_sprites),
+            "scores": [p.score for p in self.players],
+        }
+
+        self.reset()
+        self.input_provider = None
+
+        return results
+
+    def run_replay(self, replay, render: bool = False) -> dict:
+        """Play back a recorded match as fast as possible and return timing results and hash mismatches."""
+        replay.configure(self)
+        self.input_provider = replay.input_provider
+        self.start_match(replay.seed)
+        replay.begin(self)
+
+        t0 = time.perf_counter()
+        for _ in range(replay.nframes):
+            pygame.event.pump()
+            self.spawn_enemies()
+            self.on_loop()
+            replay.check(self)
+
+            if render:
+                self.on_render()
+
+            self.profiler.end_frame()
+        seconds = time.perf_counter() - t0
+
+        results = {
+            "frames": replay.nframes,
+            "seconds": seconds,
+            "fps": replay.nframes / seconds if seconds > 0 else float("inf"),
+            "checked": len(replay.hashes),
+            "mismatches": replay.mismatches,
+            "scores": [p.score for p in self.players],
+        }
+
+        self.reset()
+        self.input_provider = None
+
+        return results
+
     def reset(self):
-        """Reset game."""
-        self.bg_x = 0
-        self.bg_dx = 3
+        """Reset game, writing out any input recording."""
+        if self.recorder is not None:
+            self.recorder.save(self.record_filepath)
+            self.recorder = None
+        self.cycle_requests.clear()
+        self.ships = []
+
+        self.background.reset()
+        if self.background_index != 0:
+            self.background.switch(self.background_filepaths[0])
+            self.background_index = 0
         self.gametime = 0
+        self.frame = 0
+        self.render_frame = 0
+        self.transform_stats = {"rebuilds": 0, "skips": 0}
+        self.previous_centers = {}
+
+        self.dirty_rects.invalidate()
+
+        for index in self.target_indexes.values():
+            index.frame = -1
+
+        self.timers.clear()
 
         for s in self.all_sprites:
             s.kill()
 
+        self.explosions.clear()
+
     def add_player(self, player):
         """Add player to game."""
         player.parent = self
+        player.collision_mask = self.collision_matrix.mask(player.collision_category)
         self.all_sprites.add(player)
         self.players.add(player)
 
     def add_enemy(self, enemy):
         """Add enemy to game."""
         enemy.parent = self
+        enemy.collision_mask = self.collision_matrix.mask(enemy.collision_category)
         self.all_sprites.add(enemy)
         self.enemies.add(enemy)
+        self.ai.add(enemy)
+        self.check_bounds(enemy)
+
+        # Keep enemies vertically on screen
+        h = enemy.height / 2
+        self.enemy_motion.add(enemy, (-math.inf, h, math.inf, self.screen_height - h))
 
     def add_projectile(self, projectile):
         """Add projectile to game."""
+        projectile.collision_mask = self.collision_matrix.mask(projectile.collision_category)
         self.all_sprites.add(projectile)
         self.projectiles.add(projectile)
+        self.collision_groups[projectile.collision_category].add(projectile)
+
+        cls = type(projectile)
+        if cls not in self.projectile_systems:
+            self.projectile_systems[cls] = projectile.system_class()
+        self.projectile_systems[cls].add(projectile)
+
+        projectile.start_timers(self.timers)
+        self.check_bounds(projectile)
 
     def add_projectiles(self, plist):
         """Add multiple projectiles to game."""
@@ -0,0 +1,71 @@
+"""Definition of heads-up display classes."""
+import pygame
+
+import spaceshooter.data_classes.colors as colors
+
+class Hud:
+    """Status bar that re-renders a label only when its text changes.
+
+    All labels are composited into one cached bar surface, which is blitted
+    to the screen in a single call.
+    """
+    def __init__(
+            self,
+            font_filepath: str = "freesansbold.ttf",
+            font_size: int = 32,
+            color = colors.WHITE):
+        """Initialize class."""
+        self.font_filepath = font_filepath
+        self.font_size = font_size
+        self.color = color
+
+        self.font = None
+        self.labels = {}
+        self.surface = None
+        self.dirty = True
+
+        self.renders = 0
+
+    def get_font(self):
+        """Return font, loading it on first use."""
+        if self.font is None:
+            self.font = pygame.font.Font(self.font_filepath, self.font_size)
+
+        return self.font
+
+    def set_label(self, name: str, text: str, anchor: str = "left", x: int = 0):
+        """Set label text and horizontal anchor ("left", "centerx" or "right") at x."""
+        label = self.labels.get(name)
+        if label is not None and label["text"] == text and label["anchor"] == anchor and label["x"] == x:
+            return
+
+        self.labels[name] = {
+            "text": text,
+            "anchor": anchor,
+            "x": x,
+            "image": self.get_font().render(text, True, self.color),
+        }
+        self.renders += 1
+        self.dirty = True
+
+    def remove_label(self, name: str):
+        """Remove label."""
+        if self.labels.pop(name, None) is not None:
+            self.dirty = True
+
+    def draw(self, screen):
+        """Draw status bar at the top of screen."""
+        width = screen.get_width()
+        if self.surface is None or self.surface.get_width() != width:
+            self.surface = pygame.Surface((width, self.get_font().get_linesize()), pygame.SRCALPHA)
+            self.dirty = True
+
+        if self.dirty:
+            self.surface.fill((0, 0, 0, 0))
+            for label in self.labels.values():
+                rect = label["image"].get_rect()
+                setattr(rect, label["anchor"], label["x"])
+                self.surface.blit(label["image"], rect)
+            self.dirty = False
+
+        return screen.blit(self.surface, (0, 0))
@@ -6,9 +6,19 @@ from pygame.sprite import Sprite
 from pygame.math import Vector2
 from typing import List, Tuple
 
+import spaceshooter.data_classes.collision_classes as collision
+import spaceshooter.data_classes.physics_classes as physics
+
 # %% Top-level parent
 class SpriteParent(Sprite):
     """Top-level parent class"""
+    # Narrowphase collision tier: "circle", "obb" or "mask"
+    collision_shape = "mask"
+
+    # Collision category bit and bitfield of categories collided with
+    collision_category = collision.CATEGORY_NONE
+    collision_mask = collision.CATEGORY_NONE
+
     def __init__(
             self, 
             parent = None,
@@ -26,9 +36,49 @@ class SpriteParent(Sprite):
         self.width = width
         self.radius = radius
 
+        # Pending timers, cancelled when the sprite is killed
+        self.scheduled = []
+
+    def reinit(
+            self, 
+            parent = None,
+            name: str = "",
+            height: int = 30,
+            width: int = 30,
+            radius: float = 30
+            ):
+        """Reinitialize pooled sprite with the constructor arguments."""
+        self.parent = parent
+        self.name = name
+        self.height = height
+        self.width = width
+        self.radius = radius
+
+    def schedule(self, timers, seconds: float, callback, *args):
+        """Run callback(*args) on timers seconds from now, unless the sprite is killed first."""
+        self.scheduled = [t for t in self.scheduled if t.pending]
+        timer = timers.schedule(seconds, callback, *args)
+        self.scheduled.append(timer)
+
+        return timer
+
+    def kill(self):
+        """Cancel pending timers and remove sprite from all groups."""
+        for timer in self.scheduled:
+            timer.cancel()
+        self.scheduled = []
+
+        super().kill()
+
 
 class MovableSprite(SpriteParent):
     """Parent class defining movement properties."""
+    rotation_steps = 64
+
+    # Transform refreshes done and skipped since the counters were last cleared, over all sprites
+    transform_rebuilds = 0
+    transform_skips = 0
+
     def __init__(
             self, 
             mass: float = 1, 
@@ -43,7 +93,11 @@ class MovableSprite(SpriteParent):
             health : int = 100,
             **kwargs
             ):
-        """Initialize class."""
+        """Initialize class.
+
+        Velocities are in pixels (radians) per second, drags are the fraction
+        of velocity lost per second.
+        """
         super().__init__(**kwargs)
 
         self.mass = mass
@@ -61,6 +115,63 @@ class MovableSprite(SpriteParent):
 
         self.health = health
 
+        # Pixel position and atlas frame the image, rect and mask were built for
+        self.transform = None
+
+    def reinit(
+            self, 
+            mass: float = 1, 
+            position: List[float]|Vector2 = [0, 0], 
+            velocity: List[float]|Vector2 = [0, 0], 
+            velocity_max: float = 10,
+            velocity_drag: float = 0,
+            angle: float = 0, 
+            angle_velocity: float = 0,
+            angle_velocity_max: float = 0,
+            angle_velocity_drag: float = 0,
+            health : int = 100,
+            **kwargs
+            ):
+        """Reinitialize pooled sprite, reusing its vectors."""
+        super().reinit(**kwargs)
+
+        self.mass = mass
+
+        self.position.update(position)
+        self.velocity.update(velocity)
+        self.velocity_max = velocity_max
+
+        self.angle = angle
+        self.angle_velocity = angle_velocity
+        self.angle_velocity_max = angle_velocity_max
+
+        self.velocity_drag = velocity_drag
+        self.angle_velocity_drag = angle_velocity_drag
+
+        self.health = health
+
+        # Pixel position and atlas frame the image, rect and mask were built for
+        self.transform = None
+
+    def update_transform(self):
+        """Center image, rect and mask from atlas on position, only redoing what changed."""
+        x, y = round(self.position[0]), round(self.position[1])
+        frame = self.atlas.index(self.angle)
+        key = (x, y, frame)
+        if key == self.transform:
+            MovableSprite.transform_skips += 1
+            return
+
+        if self.transform is None or frame != self.transform[2]:
+            self.image = self.atlas.images[frame]
+            self.mask = self.atlas.masks[frame]
+            self.rect = self.image.get_rect(center = (x, y))
+        else:
+            self.rect.center = (x, y)
+
+        self.transform = key
+        MovableSprite.transform_rebuilds += 1
+
 
 class PlayerParent(MovableSprite):
     """Parent class for player."""
@@ -88,12 +199,13 @@ class PlayerParent(MovableSprite):
     @property
     def delta_time(self):
         """Return time delta."""
-        return 1.0 if self.parent is None or self.parent.fps == 0 else 1.0 / self.parent.fps
+        return 1.0 if self.parent is None else self.parent.delta_time
 
-    def key_press(self):
+    def key_press(self, keys = None):
         """React to key press."""
         # Get pressed keys
-        keys = pygame.key.get_pressed()
+        if keys is None:
+            keys = pygame.key.get_pressed()
 
         for key, action in self.control_dict.items():
             # Check if key is relevant
@@ -130,11 +242,33 @@ class WeaponParent(pygame.sprite.Sprite):
 
         self.cooldown = 0
 
-    def update_counters(self):
-        """Update counters."""
-        self.cooldown = max(0, self.cooldown - 1)
+        # Projectiles fired, for staggering their timers
+        self.launches = 0
+
+    @property
+    def delta_time(self):
+        """Return time delta."""
+        return 1.0 if self.parent is None or self.parent.parent is None else self.parent.parent.delta_time
+
+    @property
+    def timers(self):
+        """Return timer wheel of the game the weapon's ship is in, or None."""
+        return None if self.parent is None or self.parent.parent is None else self.parent.parent.timers
+
+    def start_cooldown(self):
+        """Block firing for 1 / fire_rate seconds, or not at all outside a game."""
+        timers = self.timers
+        if timers is None:
+            self.cooldown = 0
+            return
+
+        self.cooldown = 1 / self.fire_rate
+        timers.schedule(self.cooldown, self.reload)
+
+    def reload(self):
+        """End cooldown."""
+        self.cooldown = 0
 
-    
     def fire(self) -> Tuple:
         """Fire weapon."""
         projectile = None
@@ -146,19 +280,25 @@ class WeaponParent(pygame.sprite.Sprite):
             return projectile, momentum, energy
         
         print("Pew pew")
-        self.cooldown = 1 / (self.fire_rate * self.delta_time)
+        self.start_cooldown()
         return projectile, momentum, energy
 
 class ProjectileParent(MovableSprite):
     """Projectile parent class."""
+    system_class = physics.ProjectileSystem
+
+    # Object pool the projectile returns to when killed
+    pool = None
+    in_pool = False
+
     def __init__(
             self,
             initial_velocity: float = 1,
             final_velocity: float = 5,
             damage: int = 1,
-            lifetime: int = 1,
+            lifetime: float = 1,
             **kwargs):
-        """Initialize class."""
+        """Initialize class. Lifetime is in simulated seconds, counted by the game's timer wheel."""
         super().__init__(**kwargs)
 
         self.initial_velocity = initial_velocity
@@ -166,3 +306,45 @@ class ProjectileParent(MovableSprite):
         self.damage = damage
         self.lifetime = lifetime
 
+        # Projectile system holding the motion state, see add_projectile
+        self.system = None
+        self.slot = -1
+
+    def reinit(
+            self,
+            initial_velocity: float = 1,
+            final_velocity: float = 5,
+            damage: int = 1,
+            lifetime: float = 1,
+            **kwargs):
+        """Reinitialize pooled projectile."""
+        super().reinit(**kwargs)
+
+        self.initial_velocity = initial_velocity
+        self.final_velocity = final_velocity
+        self.damage = damage
+        self.lifetime = lifetime
+
+    def start_timers(self, timers):
+        """Schedule expiry at the end of the lifetime."""
+        self.schedule(timers, self.lifetime, self.kill)
+
+    def kill(self):
+        """Remove sprite from all groups and its projectile system."""
+        if self.system is not None:
+            self.system.remove(self)
+
+        super().kill()
+
+        if self.pool is not None:
+            self.pool.release(self)
+
+    @property
+    def collision_category(self):
+        """Return collision category based on the side that fired the projectile."""
+        ship = None if self.parent is None else self.parent.parent
+        if ship is not None and ship.collision_category == collision.CATEGORY_ENEMY:
+            return collision.CATEGORY_ENEMY_PROJECTILE
+
+        return collision.CATEGORY_PLAYER_PROJECTILE
+
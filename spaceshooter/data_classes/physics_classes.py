@@ -0,0 +1,329 @@
+"""Definition of batched physics systems."""
+import math
+import numpy as np
+
+class ProjectileSystem:
+    """Structure-of-arrays store integrating all projectiles of one type at once.
+
+    Sprites registered with the system become thin views: the arrays hold
+    the motion state and the sprite copies it back in its own update for
+    drawing and collision.
+    """
+    def __init__(self, capacity: int = 256):
+        """Initialize class."""
+        self.capacity = 0
+        self.position = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.velocity_drag = np.zeros(0)
+        self.angle = np.zeros(0)
+        self.angle_velocity = np.zeros(0)
+        self.angle_velocity_drag = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+
+        self.sprites = []
+        self.free = []
+
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def grow(self, capacity: int):
+        """Grow arrays to hold capacity projectiles."""
+        n = capacity - self.capacity
+        if n <= 0:
+            return
+
+        self.position = np.concatenate([self.position, np.zeros((n, 2))])
+        self.velocity = np.concatenate([self.velocity, np.zeros((n, 2))])
+        self.velocity_drag = np.concatenate([self.velocity_drag, np.zeros(n)])
+        self.angle = np.concatenate([self.angle, np.zeros(n)])
+        self.angle_velocity = np.concatenate([self.angle_velocity, np.zeros(n)])
+        self.angle_velocity_drag = np.concatenate([self.angle_velocity_drag, np.zeros(n)])
+        self.alive = np.concatenate([self.alive, np.zeros(n, dtype=bool)])
+
+        self.sprites.extend([None] * n)
+        self.free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def add(self, sprite):
+        """Register sprite and copy its motion state into the arrays."""
+        if not self.free:
+            self.grow(max(1, 2 * self.capacity))
+
+        ii = self.free.pop()
+        self.position[ii] = sprite.position
+        self.velocity[ii] = sprite.velocity
+        self.velocity_drag[ii] = sprite.velocity_drag
+        self.angle[ii] = sprite.angle
+        self.angle_velocity[ii] = sprite.angle_velocity
+        self.angle_velocity_drag[ii] = sprite.angle_velocity_drag
+        self.alive[ii] = True
+
+        self.sprites[ii] = sprite
+        sprite.system = self
+        sprite.slot = ii
+
+    def remove(self, sprite):
+        """Unregister sprite and free its slot."""
+        ii = sprite.slot
+        self.alive[ii] = False
+        self.sprites[ii] = None
+        self.free.append(ii)
+
+        sprite.system = None
+        sprite.slot = -1
+
+    def read(self, sprite):
+        """Copy motion state from the arrays back to sprite."""
+        ii = sprite.slot
+        x, y = self.position[ii]
+        vx, vy = self.velocity[ii]
+        sprite.position.update(x, y)
+        sprite.velocity.update(vx, vy)
+        sprite.angle = float(self.angle[ii])
+        sprite.angle_velocity = float(self.angle_velocity[ii])
+
+    def steer(self, idx, dt: float):
+        """Adjust velocities and angles before integration."""
+        pass
+
+    def step(self, dt: float):
+        """Integrate and apply drag to all projectiles."""
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0:
+            return
+
+        self.steer(idx, dt)
+
+        v = self.velocity[idx]
+        vd = self.velocity_drag[idx]
+        av = self.angle_velocity[idx]
+        avd = self.angle_velocity_drag[idx]
+
+        # Apply drag
+        v1 = v * ((1 - vd) ** dt)[:, None]
+        v1[np.abs(v1) < 0.001] = 0
+
+        av1 = av * (1 - avd) ** dt
+        av1[np.abs(av1) < 0.001] = 0
+
+        # Calculate new position and angle
+        self.position[idx] += v * dt
+        self.angle[idx] = (self.angle[idx] + av1 * dt) % (2 * math.pi)
+
+        self.velocity[idx] = v1
+        self.angle_velocity[idx] = av1
+
+class HomingMissileSystem(ProjectileSystem):
+    """Projectile system steering each projectile towards its target."""
+    # Acceleration towards target in pixels per second squared
+    thrust = 3000
+
+    def steer(self, idx, dt: float):
+        """Turn projectiles with a target towards it and accelerate."""
+        targeted = [ii for ii in idx if self.sprites[ii].target is not None and self.sprites[ii].target.alive()]
+        if not targeted:
+            return
+
+        targeted = np.array(targeted)
+        targets = np.array([self.sprites[ii].target.position for ii in targeted])
+
+        d = targets - self.position[targeted]
+        n = np.hypot(d[:, 0], d[:, 1])
+        n[n == 0] = 1
+        ut = d / n[:, None]
+
+        self.angle[targeted] = np.arctan2(-ut[:, 1], ut[:, 0])
+        self.velocity[targeted] += self.thrust * dt * ut
+
+# Enemy motion kinds
+MOTION_LINEAR = 0
+MOTION_SINE = 1
+MOTION_PATH = 2
+
+MOTION_KINDS = {
+    "linear": MOTION_LINEAR,
+    "sine": MOTION_SINE,
+    "path": MOTION_PATH,
+}
+
+class EnemyMotionSystem:
+    """Structure-of-arrays store moving all enemies at once.
+
+    Linear enemies drift with their velocity. Sine enemies drift the same
+    way while their y oscillates around the drifting anchor. Path enemies
+    fly through up to max_waypoints points at constant speed and continue
+    linearly after the last one. Positions are clamped to per-enemy bounds.
+    Linear and sine enemies can sidestep vertically with evade().
+    """
+    max_waypoints = 8
+
+    # Fraction of dodge velocity left after one second
+    dodge_drag = 0.05
+
+    def __init__(self, capacity: int = 256):
+        """Initialize class."""
+        self.capacity = 0
+        self.position = np.zeros((0, 2))
+        self.anchor = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.kind = np.zeros(0, dtype=int)
+        self.time = np.zeros(0)
+        self.amplitude = np.zeros(0)
+        self.frequency = np.zeros(0)
+        self.phase = np.zeros(0)
+        self.speed = np.zeros(0)
+        self.dodge = np.zeros(0)
+        self.path = np.zeros((0, self.max_waypoints, 2))
+        self.path_length = np.zeros(0, dtype=int)
+        self.waypoint = np.zeros(0, dtype=int)
+        self.lower = np.zeros((0, 2))
+        self.upper = np.zeros((0, 2))
+        self.alive = np.zeros(0, dtype=bool)
+
+        self.sprites = []
+        self.free = []
+
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def grow(self, capacity: int):
+        """Grow arrays to hold capacity enemies."""
+        n = capacity - self.capacity
+        if n <= 0:
+            return
+
+        self.position = np.concatenate([self.position, np.zeros((n, 2))])
+        self.anchor = np.concatenate([self.anchor, np.zeros((n, 2))])
+        self.velocity = np.concatenate([self.velocity, np.zeros((n, 2))])
+        self.kind = np.concatenate([self.kind, np.zeros(n, dtype=int)])
+        self.time = np.concatenate([self.time, np.zeros(n)])
+        self.amplitude = np.concatenate([self.amplitude, np.zeros(n)])
+        self.frequency = np.concatenate([self.frequency, np.zeros(n)])
+        self.phase = np.concatenate([self.phase, np.zeros(n)])
+        self.speed = np.concatenate([self.speed, np.zeros(n)])
+        self.dodge = np.concatenate([self.dodge, np.zeros(n)])
+        self.path = np.concatenate([self.path, np.zeros((n, self.max_waypoints, 2))])
+        self.path_length = np.concatenate([self.path_length, np.zeros(n, dtype=int)])
+        self.waypoint = np.concatenate([self.waypoint, np.zeros(n, dtype=int)])
+        self.lower = np.concatenate([self.lower, np.zeros((n, 2))])
+        self.upper = np.concatenate([self.upper, np.zeros((n, 2))])
+        self.alive = np.concatenate([self.alive, np.zeros(n, dtype=bool)])
+
+        self.sprites.extend([None] * n)
+        self.free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def add(self, sprite, bounds=(-math.inf, -math.inf, math.inf, math.inf)):
+        """Register sprite, copying its motion state and sprite.motion settings into the arrays.
+
+        bounds are the lowest and highest x and y the position is clamped to.
+        """
+        if not self.free:
+            self.grow(max(1, 2 * self.capacity))
+
+        motion = {} if sprite.motion is None else sprite.motion
+
+        ii = self.free.pop()
+        self.position[ii] = sprite.position
+        self.anchor[ii] = sprite.position
+        self.velocity[ii] = sprite.velocity
+        self.kind[ii] = MOTION_KINDS[motion.get("type", "linear")]
+        self.time[ii] = 0
+        self.amplitude[ii] = motion.get("amplitude", 50)
+        self.frequency[ii] = motion.get("frequency", 0.5)
+        self.phase[ii] = motion.get("phase", 0)
+        self.speed[ii] = motion.get("speed", math.hypot(*sprite.velocity))
+        self.dodge[ii] = 0
+
+        # Path points are offsets from the starting position
+        points = motion.get("points", [])[:self.max_waypoints]
+        self.path_length[ii] = len(points)
+        self.waypoint[ii] = 0
+        if points:
+            self.path[ii, :len(points)] = np.asarray(points, dtype=float) + self.position[ii]
+        elif self.kind[ii] == MOTION_PATH:
+            self.kind[ii] = MOTION_LINEAR
+
+        self.lower[ii] = bounds[:2]
+        self.upper[ii] = bounds[2:]
+        self.alive[ii] = True
+
+        self.sprites[ii] = sprite
+        sprite.system = self
+        sprite.slot = ii
+
+    def remove(self, sprite):
+        """Unregister sprite and free its slot."""
+        ii = sprite.slot
+        self.alive[ii] = False
+        self.sprites[ii] = None
+        self.free.append(ii)
+
+        sprite.system = None
+        sprite.slot = -1
+
+    def read(self, sprite):
+        """Copy motion state from the arrays back to sprite."""
+        ii = sprite.slot
+        x, y = self.position[ii]
+        vx, vy = self.velocity[ii]
+        sprite.position.update(x, y)
+        sprite.velocity.update(vx, vy)
+
+    def kick(self, sprite, dv):
+        """Change velocity of sprite by dv, e.g. for weapon recoil. Path enemies keep to their path."""
+        self.velocity[sprite.slot] += dv
+
+    def evade(self, sprite, vy: float):
+        """Start a vertical sidestep of sprite at vy pixels per second."""
+        self.dodge[sprite.slot] = vy
+
+    def follow(self, idx, dt: float):
+        """Move path enemies towards their next waypoint."""
+        target = self.path[idx, self.waypoint[idx]]
+        d = target - self.position[idx]
+        dist = np.hypot(d[:, 0], d[:, 1])
+        step = self.speed[idx] * dt
+
+        n = np.where(dist == 0, 1, dist)
+        self.velocity[idx] = d * (self.speed[idx] / n)[:, None]
+
+        arrive = dist <= step
+        self.position[idx] = np.where(arrive[:, None], target, self.position[idx] + self.velocity[idx] * dt)
+
+        # Advance waypoints, switching to linear motion after the last one
+        arrived = idx[arrive]
+        self.waypoint[arrived] += 1
+        done = arrived[self.waypoint[arrived] >= self.path_length[arrived]]
+        self.kind[done] = MOTION_LINEAR
+        self.waypoint[done] = 0
+        self.anchor[done] = self.position[done]
+
+    def step(self, dt: float):
+        """Move and clamp all enemies."""
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0:
+            return
+
+        self.time[idx] += dt
+        kind = self.kind[idx]
+
+        drift = idx[kind != MOTION_PATH]
+        self.anchor[drift] += self.velocity[drift] * dt
+        self.anchor[drift, 1] += self.dodge[drift] * dt
+        self.anchor[drift] = np.clip(self.anchor[drift], self.lower[drift], self.upper[drift])
+        self.dodge[idx] *= self.dodge_drag ** dt
+        self.position[drift] = self.anchor[drift]
+
+        sine = idx[kind == MOTION_SINE]
+        self.position[sine, 1] += self.amplitude[sine] * np.sin(2 * math.pi * self.frequency[sine] * self.time[sine] + self.phase[sine])
+
+        path = idx[kind == MOTION_PATH]
+        if len(path) > 0:
+            self.follow(path, dt)
+
+        self.position[idx] = np.clip(self.position[idx], self.lower[idx], self.upper[idx])
@@ -0,0 +1,65 @@
+"""Definition of object pools for short-lived sprites."""
+from typing import Callable
+
+class ObjectPool:
+    """Pool of reusable objects.
+
+    Pooled objects must provide reinit() taking the same arguments as the
+    constructor, and hand themselves back with release() when they die.
+    A fixed pool never owns more than capacity objects; requests beyond
+    that get an unpooled object. A growable pool doubles its capacity.
+    """
+    def __init__(self, factory: Callable, capacity: int = 256, growable: bool = True):
+        """Initialize class."""
+        self.factory = factory
+        self.capacity = capacity
+        self.growable = growable
+
+        self.idle = []
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.overflows = 0
+
+    def acquire(self, *args, **kwargs):
+        """Return reinitialized idle object, or a new one if none is idle."""
+        if self.idle:
+            obj = self.idle.pop()
+            obj.in_pool = False
+            obj.reinit(*args, **kwargs)
+            self.hits += 1
+            return obj
+
+        self.misses += 1
+        obj = self.factory(*args, **kwargs)
+
+        if self.size >= self.capacity:
+            if not self.growable:
+                self.overflows += 1
+                return obj
+            self.capacity *= 2
+
+        obj.pool = self
+        obj.in_pool = False
+        self.size += 1
+        return obj
+
+    def release(self, obj):
+        """Return object to the pool."""
+        if obj.in_pool:
+            return
+
+        obj.in_pool = True
+        self.idle.append(obj)
+
+    def stats(self) -> dict:
+        """Return pool counters."""
+        return {
+            "size": self.size,
+            "capacity": self.capacity,
+            "idle": len(self.idle),
+            "hits": self.hits,
+            "misses": self.misses,
+            "overflows": self.overflows,
+        }
@@ -0,0 +1,108 @@
+"""Definition of frame profiling classes."""
+import cProfile
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import pygame
+
+import spaceshooter.data_classes.colors as colors
+
+class FrameProfiler:
+    """Per-phase frame timer with ring buffer history, overlay and cProfile capture."""
+    def __init__(self, history: int = 120):
+        """Initialize class."""
+        self.history = history
+        self.timings = defaultdict(lambda: deque(maxlen=self.history))
+        self.current = {}
+
+        self.show_overlay = False
+        self.font = None
+
+        self.profile = None
+        self.capture_frames = 0
+        self.capture_filepath = ""
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as part of phase name."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] = self.current.get(name, 0) + time.perf_counter() - t0
+
+    def end_frame(self):
+        """Store timings of the finished frame and advance any running capture."""
+        for name in self.timings.keys() | self.current.keys():
+            self.timings[name].append(self.current.get(name, 0))
+        self.current = {}
+
+        if self.profile is not None:
+            self.capture_frames -= 1
+            if self.capture_frames <= 0:
+                self.stop_capture()
+
+    def averages(self) -> dict:
+        """Return mean time per phase in milliseconds over the history."""
+        return {name: 1000 * sum(t) / len(t) for name, t in self.timings.items() if len(t) > 0}
+
+    def start_capture(self, nframes: int = 300, filepath: str = ""):
+        """Capture a cProfile of the next nframes frames."""
+        if self.profile is not None:
+            return
+
+        self.capture_frames = nframes
+        self.capture_filepath = filepath if filepath else time.strftime("profile_%Y%m%d_%H%M%S.prof")
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop_capture(self):
+        """Stop capture and write stats to file."""
+        self.profile.disable()
+        self.profile.dump_stats(self.capture_filepath)
+        print(f"Profile written to {self.capture_filepath}")
+        self.profile = None
+
+    def draw_overlay(self, screen, counts: dict):
+        """Draw per-phase times and sprite counts in the lower left corner."""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+
+        averages = self.averages()
+        lines = [f"{name}: {ms:.2f} ms" for name, ms in averages.items()]
+        lines.append(f"total: {sum(averages.values()):.2f} ms")
+        lines += [f"{name}: {n}" for name, n in counts.items()]
+        if self.profile is not None:
+            lines.append(f"profiling: {self.capture_frames} frames left")
+
+        y = screen.get_height() - 18 * len(lines) - 5
+        rect = pygame.Rect(5, y, 0, 0)
+        for line in lines:
+            text = self.font.render(line, True, colors.WHITE, colors.BLACK)
+            rect.union_ip(screen.blit(text, (5, y)))
+            y += 18
+
+        return rect
+
+class StartupTimer:
+    """Seconds from launch to startup milestones, such as the menu showing and the first game frame."""
+    def __init__(self, t0: float|None = None):
+        """Initialize class, with launch time t0 from time.perf_counter()."""
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = {}
+
+    def mark(self, name: str):
+        """Record time of milestone name, unless already recorded."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.t0
+
+    def since(self, start: str, end: str) -> float|None:
+        """Return seconds between two recorded milestones."""
+        if start not in self.marks or end not in self.marks:
+            return None
+
+        return self.marks[end] - self.marks[start]
+
+    def report(self) -> str:
+        """Return milestone times in milliseconds as one line."""
+        return ", ".join(f"{name} {1000 * t:.0f} ms" for name, t in self.marks.items())
@@ -1,84 +1,43 @@
-import math
 import pygame
-from pygame.math import Vector2
 
 import spaceshooter.data_classes.colors as colors
+import spaceshooter.data_classes.asset_classes as assets
+import spaceshooter.data_classes.physics_classes as physics
+import spaceshooter.data_classes.collision_classes as collision
+from spaceshooter.data_classes.pool_classes import ObjectPool
 from spaceshooter.data_classes.parent_classes import ProjectileParent
-import spaceshooter.helpers.misc_helpers as mh
 
 class LaserProjectile(ProjectileParent):
     """Laser projectile."""
+    rotation_steps = 128
+    collision_shape = "obb"
+
     def __init__(self, **kwargs):
         """Initialize class."""
         super().__init__(self, **kwargs)
 
-        self.image0 = pygame.transform.scale(pygame.image.load("spaceshooter/Images/Projectiles/laser.png").convert(), (self.width, self.height))
-        self.image0.set_colorkey(colors.WHITE)
-        self.rect = self.image0.get_rect()
+        self.atlas = assets.images.get_atlas("spaceshooter/Images/Projectiles/laser.png", (self.width, self.height), colors.WHITE, self.rotation_steps)
+        self.update_transform()
 
-        # Set position
-        self.rect.x = self.position[0]
-        self.rect.y = self.position[1]
+    def reinit(self, **kwargs):
+        """Reinitialize pooled projectile."""
+        super().reinit(**kwargs)
 
-        self.image, self.rect = mh.rot_center(self.image0, self.angle_deg, self.rect.x, self.rect.y)
+        self.atlas = assets.images.get_atlas("spaceshooter/Images/Projectiles/laser.png", (self.width, self.height), colors.WHITE, self.rotation_steps)
+        self.update_transform()
 
     @property
     def delta_time(self):
         """Return time delta."""
         return 1.0 if self.parent is None  else self.parent.delta_time
-    
-    @property
-    def angle_deg(self):
-        """Return angle in degrees."""
-        return 180 * self.angle / math.pi
-
 
     def update(self):
         """Update sprite location"""
-        # Get properties
-        p = self.position
-        v = self.velocity
-        vd = self.velocity_drag
-
-        a = self.angle
-        av = self.angle_velocity
-        avd = self.angle_velocity_drag
-
-        dt = self.delta_time
-
-        # Apply drag
-        v1 = v * (1 - vd)
-        if abs(v1[0]) < 0.001:
-            v1[0] = 0
-        if abs(v1[1]) < 0.001:
-            v1[1] = 0
-
-        av1 = av * (1 - avd)
-        if abs(av1) < 0.001:
-            av1 = 0
+        if self.system is not None:
+            self.system.read(self)
 
-        # Calculate new position
-        p1 = p + v * dt
+        self.update_transform()
 
-        # Calculate new angle
-        a1 = (a + av1 * dt) % (2 * math.pi)
-
-        # Assign
-        self.position.update(p1)
-        self.velocity.update(v1) 
-        self.angle = a1
-        self.angle_velocity = av1
-
-        self.rect.x = self.position[0]
-        self.rect.y = self.position[1]
-
-        self.image, self.rect = mh.rot_center(self.image0, self.angle_deg, self.rect.x, self.rect.y)
-
-        self.lifetime -= 1
-        if self.lifetime <= 0:
-            self.kill()
-
-    
     def die(self):
         """Kill the sprite."""
         self.kill()
@@ -86,99 +45,87 @@ class LaserProjectile(ProjectileParent):
 
 class HomingMissileProjectile(ProjectileParent):
     """Homing missile projectile."""
+    collision_shape = "obb"
+    system_class = physics.HomingMissileSystem
+
+    # Seconds before the first lock and between retargets
+    targeting_delay = 0.5
+    retarget_interval = 0.5
+
+    # First locks of missiles fired together are spread over stagger_groups steps of retarget_stagger seconds
+    retarget_stagger = 0.05
+    stagger_groups = 4
+
     def __init__(self, **kwargs):
         """Initialize class."""
         super().__init__(self, **kwargs)
 
-        self.kill_sound = pygame.mixer.Sound("spaceshooter/Sounds/Weapons/Boom!.wav")
+        self.atlas = assets.images.get_atlas("spaceshooter/Images/Projectiles/missile.png", (self.width, self.height), colors.WHITE, self.rotation_steps)
+        self.update_transform()
+
+        self.reset_targeting()
 
-        self.image0 = pygame.transform.scale(pygame.image.load("spaceshooter/Images/Projectiles/missile.png").convert(), (self.width, self.height))
-        self.image0.set_colorkey(colors.WHITE)
-        self.rect = self.image0.get_rect()
+    def reinit(self, **kwargs):
+        """Reinitialize pooled projectile."""
+        super().reinit(**kwargs)
 
-        # Set position
-        self.rect.x = self.position[0]
-        self.rect.y = self.position[1]
+        self.atlas = assets.images.get_atlas("spaceshooter/Images/Projectiles/missile.png", (self.width, self.height), colors.WHITE, self.rotation_steps)
+        self.update_transform()
 
-        self.image, self.rect = mh.rot_center(self.image0, self.angle_deg, self.rect.x, self.rect.y)
+        self.reset_targeting()
+
+    def reset_targeting(self):
+        """Clear target and set the delay of the first lock."""
+        # Count launches per weapon, so a match does not depend on earlier ones
+        launches = 0
+        if self.parent is not None:
+            self.parent.launches += 1
+            launches = self.parent.launches
 
         self.target = None
-        self.targeting_time = 0.5 / self.delta_time
+        self.targeting_time = self.targeting_delay + (launches % self.stagger_groups) * self.retarget_stagger
+        self.retarget_timer = None
+
+    def start_timers(self, timers):
+        """Schedule expiry and the first lock."""
+        super().start_timers(timers)
+        self.retarget_timer = self.schedule(timers, self.targeting_time, self.retarget)
+
+    def retarget(self):
+        """Lock on to the nearest target and schedule the next retarget."""
+        game = self.parent.parent.parent
+        self.target = game.nearest_target(self.target_category, self.position)
+        self.retarget_timer = self.schedule(game.timers, self.retarget_interval, self.retarget)
+
+    @property
+    def target_category(self):
+        """Return collision category of the sprites this missile hunts."""
+        if self.collision_category == collision.CATEGORY_ENEMY_PROJECTILE:
+            return collision.CATEGORY_PLAYER
 
+        return collision.CATEGORY_ENEMY
 
     @property
     def delta_time(self):
         """Return time delta."""
         return 1.0 if self.parent is None  else self.parent.delta_time
-    
-    @property
-    def angle_deg(self):
-        """Return angle in degrees."""
-        return 180 * self.angle / math.pi
-
 
     def update(self):
         """Update sprite location"""
-        # Get properties
-        p = self.position
-        v = self.velocity
-        vd = self.velocity_drag
-
-        a = self.angle
-        av = self.angle_velocity
-        avd = self.angle_velocity_drag
-
-        dt = self.delta_time
-
-        if self.target is not None:
-            ut = (self.target.position - self.position).normalize()
-            self.angle = a = math.atan2(-ut.y, ut.x)
-            v += 100 * ut
-
-        # Apply drag
-        v1 = v * (1 - vd)
-        if abs(v1[0]) < 0.001:
-            v1[0] = 0
-        if abs(v1[1]) < 0.001:
-            v1[1] = 0
-
-        av1 = av * (1 - avd)
-        if abs(av1) < 0.001:
-            av1 = 0
-
-        # Calculate new position
-        p1 = p + v * dt
-
-        # Calculate new angle
-        a1 = (a + av1 * dt) % (2 * math.pi)
-
-        # Assign
-        self.position.update(p1)
-        self.velocity.update(v1) 
-        self.angle = a1
-        self.angle_velocity = av1
-
-        self.rect.x = self.position[0]
-        self.rect.y = self.position[1]
-
-        self.image, self.rect = mh.rot_center(self.image0, self.angle_deg, self.rect.x, self.rect.y)
-
-        self.targeting_time -= 1
-        if self.targeting_time <= 0:
-            # Select target
-            targets = self.parent.parent.parent.enemies
-            if len(targets) > 0:
-                pos = self.position
-                self.target = min([t for t in targets], key=lambda t: pos.distance_to(t.position))
-                # print(f"{self.name} acquired target: {self.target.name}")
-            
-        self.lifetime -= 1
-        if self.lifetime <= 0:
-            self.kill()
-
-    
+        if self.system is not None:
+            self.system.read(self)
+
+        self.update_transform()
+
+        # Retarget right away when the target is gone
+        if self.target is not None and not self.target.alive():
+            self.retarget_timer.cancel()
+            self.retarget()
+
     def die(self):
         """Kill the sprite."""
         self.kill()
-        if self.parent.parent.parent.sound_on:
-            pygame.mixer.Sound.play(self.kill_sound)
\ No newline at end of file
+        self.parent.parent.parent.sounds.play("boom")
+
+laser_pool = ObjectPool(LaserProjectile)
+missile_pool = ObjectPool(HomingMissileProjectile)
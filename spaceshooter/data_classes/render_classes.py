@@ -0,0 +1,50 @@
+"""Definition of rendering helper classes."""
+from typing import List
+import pygame
+
+class DirtyRectTracker:
+    """Track screen regions drawn each frame so only those need to be redrawn.
+
+    collect() returns the regions to clear and push to the display, or None
+    when a full redraw is cheaper because the dirty area is too large.
+    """
+    def __init__(self, threshold: float = 0.4):
+        """Initialize class."""
+        self.threshold = threshold
+        self.previous = None
+
+        self.full_frames = 0
+        self.dirty_frames = 0
+        self.dirty_area = 0
+
+    def invalidate(self):
+        """Force a full redraw next frame."""
+        self.previous = None
+
+    def collect(self, rects: List[pygame.Rect], screen_area: int):
+        """Return rects to update this frame, or None if a full redraw is needed."""
+        if self.previous is None:
+            self.full_frames += 1
+            return None
+
+        dirty = self.previous + rects
+        area = sum(r.width * r.height for r in dirty)
+        if area > self.threshold * screen_area:
+            self.full_frames += 1
+            return None
+
+        self.dirty_frames += 1
+        self.dirty_area = area
+        return dirty
+
+    def commit(self, rects: List[pygame.Rect]):
+        """Remember rects drawn this frame, to be cleared next frame."""
+        self.previous = rects
+
+    def stats(self) -> dict:
+        """Return frame counters."""
+        return {
+            "full_frames": self.full_frames,
+            "dirty_frames": self.dirty_frames,
+            "dirty_area": self.dirty_area,
+        }
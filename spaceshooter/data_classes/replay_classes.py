@@ -0,0 +1,163 @@
+"""Definition of input recording and replay classes."""
+import hashlib
+import struct
+
+import spaceshooter.helpers.misc_helpers as mh
+
+MAGIC = b"SSRP"
+VERSION = 1
+
+# magic, version, seed, tick_rate, screen_width, screen_height, nenemies, enemy_rate, nplayers, hash_interval
+HEADER = struct.Struct("<4sBIHHHHdBH")
+COUNT = struct.Struct("<I")
+HASH = struct.Struct("<IQ")
+
+# Action bits follow control_dict order, the top bit is the weapon level cheat
+CYCLE_LEVEL_BIT = 1 << 7
+
+def state_hash(game) -> int:
+    """Return 64 bit hash of frame, sprite types and positions, scores and lives."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(struct.pack("<I", game.frame))
+    for s in game.all_sprites:
+        h.update(type(s).__name__.encode())
+        h.update(struct.pack("<4i", *s.rect))
+
+    for p in game.players:
+        h.update(struct.pack("<2i", p.score, p.lives))
+
+    h.update(struct.pack("<I", len(game.explosions)))
+
+    return int.from_bytes(h.digest(), "little")
+
+class InputRecorder:
+    """Record per-tick player actions as one byte per player, plus periodic state hashes."""
+    def __init__(self, game, seed: int, hash_interval: int = 60):
+        """Initialize class."""
+        self.seed = seed
+        self.hash_interval = hash_interval
+
+        self.tick_rate = game.tick_rate
+        self.screen_size = game.screen_size
+        self.nenemies = game.nenemies
+        self.enemy_rate = game.enemy_rate
+
+        # Players are numbered in the order they joined the match
+        self.index = {p: ii for ii, p in enumerate(game.players)}
+        self.current = bytearray(len(self.index))
+        self.inputs = bytearray()
+        self.hashes = []
+
+    def record(self, player, keys, cycle_level: bool = False):
+        """Store actions of player this tick."""
+        mask = CYCLE_LEVEL_BIT if cycle_level else 0
+        for ii, key in enumerate(player.control_dict):
+            if keys[key]:
+                mask |= 1 << ii
+
+        self.current[self.index[player]] = mask
+
+    def end_frame(self, game):
+        """Append this tick's actions, and a state hash every hash_interval ticks."""
+        self.inputs += self.current
+        self.current = bytearray(len(self.index))
+
+        if game.frame % self.hash_interval == 0:
+            self.hashes.append((game.frame, state_hash(game)))
+
+    def save(self, filepath: str):
+        """Write recording to binary file."""
+        nplayers = len(self.index)
+        with open(filepath, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, self.seed, self.tick_rate, *self.screen_size,
+                self.nenemies, self.enemy_rate, nplayers, self.hash_interval))
+            f.write(COUNT.pack(len(self.inputs) // max(1, nplayers)))
+            f.write(self.inputs)
+            f.write(COUNT.pack(len(self.hashes)))
+            for frame, value in self.hashes:
+                f.write(HASH.pack(frame, value))
+
+class Replay:
+    """Recorded match, fed back as player input with state hash checks."""
+    def __init__(
+            self,
+            seed: int,
+            tick_rate: int,
+            screen_size,
+            nenemies: int,
+            enemy_rate: float,
+            nplayers: int,
+            hash_interval: int,
+            inputs: bytes,
+            hashes: dict):
+        """Initialize class."""
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.screen_size = screen_size
+        self.nenemies = nenemies
+        self.enemy_rate = enemy_rate
+        self.nplayers = nplayers
+        self.hash_interval = hash_interval
+        self.inputs = inputs
+        self.hashes = hashes
+
+        self.index = {}
+        self.mismatches = []
+
+    @classmethod
+    def load(cls, filepath: str):
+        """Read recording from binary file."""
+        with open(filepath, "rb") as f:
+            data = f.read()
+
+        magic, version, seed, tick_rate, w, h, nenemies, enemy_rate, nplayers, hash_interval = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} replay")
+
+        offset = HEADER.size
+        (nframes,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        inputs = data[offset:offset + nframes * nplayers]
+        offset += nframes * nplayers
+
+        (nhashes,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        hashes = dict(HASH.unpack_from(data, offset + ii * HASH.size) for ii in range(nhashes))
+
+        return cls(seed, tick_rate, (w, h), nenemies, enemy_rate, nplayers, hash_interval, inputs, hashes)
+
+    @property
+    def nframes(self):
+        """Return number of recorded ticks."""
+        return len(self.inputs) // max(1, self.nplayers)
+
+    def configure(self, game):
+        """Apply recorded match settings to game."""
+        game.tick_rate = self.tick_rate
+        game.nenemies = self.nenemies
+        game.enemy_rate = self.enemy_rate
+        game.nplayers = self.nplayers
+        game.deterministic = True
+
+    def begin(self, game):
+        """Number players of a freshly started match."""
+        self.index = {p: ii for ii, p in enumerate(game.players)}
+        self.mismatches = []
+
+    def input_provider(self, game, player):
+        """Return recorded key states of player for the current tick."""
+        mask = self.inputs[(game.frame - 1) * self.nplayers + self.index[player]]
+        if mask & CYCLE_LEVEL_BIT:
+            game.cycle_requests.add(player)
+
+        return mh.pressed_keys(k for ii, k in enumerate(player.control_dict) if mask & (1 << ii))
+
+    def check(self, game) -> bool:
+        """Compare state hash against the recording, if one was stored for this tick."""
+        expected = self.hashes.get(game.frame)
+        if expected is None or expected == state_hash(game):
+            return True
+
+        self.mismatches.append(game.frame)
+        return False
@@ -1,24 +1,31 @@
 """Define ship class."""
 import math
-import numpy as np
 from pygame.math import Vector2
 from typing import List
 import pygame
 
 import spaceshooter.data_classes.colors as colors
+import spaceshooter.data_classes.asset_classes as assets
+import spaceshooter.data_classes.collision_classes as collision
 from spaceshooter.data_classes.parent_classes import PlayerParent
 import spaceshooter.data_classes.weapon_classes as weapons
 
 class Ship(PlayerParent):
     """Ship class."""
+    collision_shape = "mask"
+    collision_category = collision.CATEGORY_PLAYER
+
+    # Seconds a ship can't be hit after losing a life
+    respawn_time = 2
+
     def __init__(self, boost_acceleration: float = 0, lives: int = 3, **kwargs):
         """Initialize class."""
         super().__init__(**kwargs)
 
         self.boost_acceleration = boost_acceleration
 
-        self.image = pygame.transform.scale(pygame.image.load("spaceshooter/Images/Ships/ship_default.png").convert(), (self.width, self.height))
-        self.image.set_colorkey(colors.WHITE)
+        self.atlas = assets.images.get_atlas("spaceshooter/Images/Ships/ship_default.png", (self.width, self.height), colors.WHITE, 1)
+        self.image, self.mask = self.atlas.frame(0)
         self.rect = self.image.get_rect()
 
         # Set position
@@ -28,6 +35,10 @@ class Ship(PlayerParent):
         self.lives = lives
         self.score = 0
 
+        # Where the ship returns to after losing a life, and whether it can be hit
+        self.spawn_position = Vector2(self.position)
+        self.invulnerable = False
+
         # Weapons
         self.primary_weapon = weapons.Laser(parent=self)
         self.secondary_weapon = weapons.HomingMissile(parent=self)
@@ -79,19 +90,25 @@ class Ship(PlayerParent):
         self.rect.x = self.position[0]
         self.rect.y = self.position[1]
 
-        self.update_counters()
-
-    def update_counters(self):
-        """Update counters."""
-        if self.primary_weapon is not None:
-            self.primary_weapon.update_counters()
-        
-        if self.secondary_weapon is not None:
-            self.secondary_weapon.update_counters()
-    
     def die(self):
-        """Kill the sprite."""
-        self.kill()
+        """Lose a life and respawn, or kill the sprite when none are left."""
+        if self.invulnerable:
+            return
+
+        self.parent.explosions.emit(self.rect.centerx, self.rect.centery, self.velocity)
+
+        self.lives -= 1
+        if self.lives <= 0:
+            self.kill()
+            return
+
+        self.position.update(self.spawn_position)
+        self.invulnerable = True
+        self.schedule(self.parent.timers, self.respawn_time, self.end_invulnerability)
+
+    def end_invulnerability(self):
+        """Make ship hittable again."""
+        self.invulnerable = False
 
     def cycle_level(self):
         """CHEAT: Cycle weapon level."""
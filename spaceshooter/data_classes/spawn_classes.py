@@ -0,0 +1,178 @@
+"""Definition of enemy spawn scheduling classes."""
+import random
+from typing import List
+
+from spaceshooter.data_classes.enemy_classes import get_default_enemy
+
+class SpawnScheduler:
+    """Spawn enemies from a wave timeline within a per-tick time budget.
+
+    Each wave is a dict with the keys
+        time: seconds into the match of the first spawn
+        formation: "single", "column", "row" or "v"
+        count: number of enemies
+        y: formation center as a fraction of screen height, random if missing
+        spacing: pixels between enemies
+        interval: seconds between enemies of one wave
+        velocity: initial enemy velocity in pixels per second
+        motion: enemy motion settings, see physics.EnemyMotionSystem
+        subtype: enemy subtype
+        repeat: seconds until the wave comes again, once if missing
+
+    Waves starting within lookahead seconds are expanded into spawns and
+    their enemies built a few per tick ahead of time. At most max_per_tick
+    enemies enter per tick, so a burst is spread over several ticks. While
+    the last frame took longer than budget seconds, due spawns are
+    deferred, and those late by more than max_delay seconds are dropped.
+    Without a budget nothing is deferred.
+    """
+    def __init__(
+            self,
+            waves: List[dict] = None,
+            budget: float|None = None,
+            lookahead: float = 2,
+            max_per_tick: int = 2,
+            build_per_tick: int = 2,
+            max_delay: float = 2):
+        """Initialize class."""
+        self.waves = [] if waves is None else waves
+        self.budget = budget
+        self.lookahead = lookahead
+        self.max_per_tick = max_per_tick
+        self.build_per_tick = build_per_tick
+        self.max_delay = max_delay
+
+        self.time = 0.0
+        self.next_times = []
+        self.pending = []
+
+        self.spawned = 0
+        self.built = 0
+        self.deferred = 0
+        self.thinned = 0
+
+    def start(self, waves: List[dict] = None, budget: float|None = None):
+        """Restart the timeline, with new waves and budget if given."""
+        if waves is not None:
+            self.waves = waves
+        self.budget = budget
+
+        self.time = 0.0
+        self.next_times = [w.get("time", 0) for w in self.waves]
+        self.pending = []
+
+    def formation(self, wave: dict, screen_size) -> list:
+        """Return spawn offsets in seconds and positions of the enemies of wave."""
+        w, h = screen_size
+        count = wave.get("count", 1)
+        spacing = wave.get("spacing", 60)
+        interval = wave.get("interval", 0)
+        shape = wave.get("formation", "single")
+
+        x = w - 100
+        y = h * wave["y"] if "y" in wave else random.randint(100, h - 100)
+
+        spawns = []
+        for ii in range(count):
+            k = ii - (count - 1) / 2
+            if shape == "column":
+                position = [x, y + k * spacing]
+            elif shape == "row":
+                position = [x + ii * spacing, y]
+            elif shape == "v":
+                position = [x + abs(k) * spacing, y + k * spacing]
+            else:
+                position = [x, y if ii == 0 else random.randint(100, h - 100)]
+            spawns.append((ii * interval, position))
+
+        return spawns
+
+    def schedule(self, screen_size):
+        """Expand waves starting within lookahead seconds into pending spawns."""
+        added = False
+        for ii, wave in enumerate(self.waves):
+            while self.next_times[ii] is not None and self.next_times[ii] <= self.time + self.lookahead:
+                t = self.next_times[ii]
+                for offset, position in self.formation(wave, screen_size):
+                    self.pending.append({
+                        "time": t + offset,
+                        "subtype": wave.get("subtype", "Ufo"),
+                        "position": position,
+                        "velocity": wave.get("velocity", [-100, 0]),
+                        "motion": wave.get("motion"),
+                        "enemy": None,
+                    })
+                added = True
+
+                repeat = wave.get("repeat")
+                self.next_times[ii] = t + repeat if repeat else None
+
+        if added:
+            self.pending.sort(key=lambda s: s["time"])
+
+    def build(self, spawn: dict):
+        """Create the enemy of spawn."""
+        enemy = get_default_enemy(spawn["subtype"], spawn["position"])
+        enemy.velocity.update(spawn["velocity"])
+        enemy.motion = spawn["motion"]
+        spawn["enemy"] = enemy
+        self.built += 1
+
+        return enemy
+
+    def update(self, game, frame_time: float = 0):
+        """Advance one tick and add due enemies to game, given the duration of the last frame in seconds."""
+        self.time += game.delta_time
+        self.schedule(game.screen_size)
+
+        over_budget = self.budget is not None and frame_time > self.budget
+
+        # Build upcoming enemies while there is time to spare
+        if not over_budget:
+            nbuilt = 0
+            for spawn in self.pending:
+                if nbuilt >= self.build_per_tick:
+                    break
+                if spawn["enemy"] is None:
+                    self.build(spawn)
+                    nbuilt += 1
+
+        nspawned = 0
+        while self.pending and self.pending[0]["time"] <= self.time:
+            spawn = self.pending[0]
+            if over_budget and self.time - spawn["time"] > self.max_delay:
+                self.pending.pop(0)
+                self.thinned += 1
+                continue
+
+            if over_budget or nspawned >= self.max_per_tick:
+                self.deferred += 1
+                break
+
+            self.pending.pop(0)
+            enemy = spawn["enemy"] if spawn["enemy"] is not None else self.build(spawn)
+            game.add_enemy(enemy)
+            nspawned += 1
+
+        self.spawned += nspawned
+
+    def stats(self) -> dict:
+        """Return spawn counters."""
+        return {
+            "pending": len(self.pending),
+            "spawned": self.spawned,
+            "built": self.built,
+            "deferred": self.deferred,
+            "thinned": self.thinned,
+        }
+
+def get_default_waves(enemy_rate: float = 0.5):
+    """Generate a timeline of single enemies every 1 / enemy_rate seconds, with formations every 30 seconds."""
+    return [
+        {"time": 1 / enemy_rate, "formation": "single", "repeat": 1 / enemy_rate},
+        {"time": 10, "formation": "column", "count": 5, "y": 0.5, "spacing": 80, "velocity": [-60, 0], "repeat": 30},
+        {"time": 20, "formation": "v", "count": 7, "spacing": 45,
+            "motion": {"type": "sine", "amplitude": 80, "frequency": 0.3}, "repeat": 30},
+        {"time": 30, "formation": "row", "count": 6, "y": 0.2, "spacing": 0, "interval": 0.5, "velocity": [-150, 0],
+            "motion": {"type": "path", "points": [[-250, 0], [-400, 250], [-250, 400], [-500, 400]]}, "repeat": 30},
+    ]
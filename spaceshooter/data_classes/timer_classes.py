@@ -0,0 +1,107 @@
+"""Definition of timer scheduling classes."""
+from typing import Callable
+
+class Timer:
+    """Handle of a callback scheduled on a TimerWheel."""
+    def __init__(self, due: int, callback: Callable, args: tuple = ()):
+        """Initialize class."""
+        self.due = due
+        self.callback = callback
+        self.args = args
+
+        self.pending = True
+
+    def cancel(self):
+        """Keep the callback from running."""
+        self.pending = False
+
+class TimerWheel:
+    """Hierarchical timing wheel running callbacks on simulation ticks.
+
+    Level 0 has one slot per tick, each higher level slots spans a full
+    turn of the level below. A timer sits in the lowest level able to hold
+    its due tick, and moves down a level when the wheel reaches its slot,
+    so advance() only touches timers that are due or being cascaded.
+    Cancelled timers are dropped when their slot comes up.
+    """
+    def __init__(self, tick_rate: int = 60, slots: int = 64, levels: int = 3):
+        """Initialize class."""
+        self.tick_rate = tick_rate
+        self.slots = slots
+        self.levels = levels
+
+        self.clear()
+
+        self.scheduled = 0
+        self.fired = 0
+        self.cascaded = 0
+
+    def clear(self):
+        """Drop all timers and restart at tick 0."""
+        self.wheels = [[[] for _ in range(self.slots)] for _ in range(self.levels)]
+        self.overflow = []
+        self.tick = 0
+
+    def ticks(self, seconds: float) -> int:
+        """Return number of ticks in seconds, at least one."""
+        return max(1, round(seconds * self.tick_rate))
+
+    def schedule(self, seconds: float, callback: Callable, *args) -> Timer:
+        """Run callback(*args) seconds from now."""
+        timer = Timer(self.tick + self.ticks(seconds), callback, args)
+        self.insert(timer)
+        self.scheduled += 1
+
+        return timer
+
+    def insert(self, timer: Timer):
+        """Put timer in the lowest level whose slots reach its due tick."""
+        span = 1
+        for level in range(self.levels):
+            if timer.due // span - self.tick // span < self.slots:
+                self.wheels[level][(timer.due // span) % self.slots].append(timer)
+                return
+            span *= self.slots
+
+        self.overflow.append(timer)
+
+    def advance(self):
+        """Move to the next tick and run the callbacks due on it."""
+        self.tick += 1
+        t = self.tick
+
+        # Cascade timers of higher level slots starting this tick, top down
+        if t % self.slots ** self.levels == 0:
+            overflow, self.overflow = self.overflow, []
+            for timer in overflow:
+                self.insert(timer)
+
+        for level in range(self.levels - 1, 0, -1):
+            span = self.slots ** level
+            if t % span != 0:
+                continue
+
+            ii = (t // span) % self.slots
+            bucket, self.wheels[level][ii] = self.wheels[level][ii], []
+            for timer in bucket:
+                if timer.pending:
+                    self.insert(timer)
+                    self.cascaded += 1
+
+        ii = t % self.slots
+        bucket, self.wheels[0][ii] = self.wheels[0][ii], []
+        for timer in bucket:
+            if timer.pending:
+                timer.pending = False
+                timer.callback(*timer.args)
+                self.fired += 1
+
+    def stats(self) -> dict:
+        """Return timer counters."""
+        return {
+            "tick": self.tick,
+            "scheduled": self.scheduled,
+            "fired": self.fired,
+            "cascaded": self.cascaded,
+            "waiting": sum(len(b) for wheel in self.wheels for b in wheel) + len(self.overflow),
+        }
@@ -10,18 +10,16 @@ class Laser(WeaponParent):
         """Initialize class."""
         super().__init__(
             fire_rate=1,
-            projectile_initial_velocity=50,
+            projectile_initial_velocity=1500,
             projectile_mass = 0,
             energy_cost=0,
             **kwargs
         )
 
-        self.sound = pygame.mixer.Sound("spaceshooter/Sounds/Weapons/laser.wav")
-
     @property
     def delta_time(self):
         """Return time delta."""
-        return 1.0 if self.parent is None or self.parent.parent.fps == 0 else 1.0 / self.parent.parent.fps
+        return 1.0 if self.parent is None or self.parent.parent is None else self.parent.parent.delta_time
 
     def set_level(self, level):
         """Set weapon level."""
@@ -55,7 +53,7 @@ class Laser(WeaponParent):
         if self.cooldown > 0 or self.energy_cost > ship.energy:
             return plist, momentum, energy
         
-        self.cooldown = 1 / (self.fire_rate * self.delta_time)
+        self.start_cooldown()
 
         px, py = ship.rect.center
         a = ship.angle
@@ -65,14 +63,14 @@ class Laser(WeaponParent):
         da = math.pi * 10 / 180
         a = ship.angle - self.nprojectiles // 2 * da
         for ii in range(self.nprojectiles):
-            vx = self.projectile_initial_velocity / self.delta_time * math.cos(a)
-            vy = - self.projectile_initial_velocity / self.delta_time * math.sin(a)
+            vx = self.projectile_initial_velocity * math.cos(a)
+            vy = - self.projectile_initial_velocity * math.sin(a)
 
-            plist.append(projectiles.LaserProjectile(
+            plist.append(projectiles.laser_pool.acquire(
                 parent=self,
                 name=f"Laser pulse from {ship.name}",
                 mass=self.projectile_mass,
-                lifetime=3 / self.delta_time,
+                lifetime=3,
                 health=1,
                 height=7,
                 width=30,
@@ -84,8 +82,7 @@ class Laser(WeaponParent):
 
             a += da
         
-        if self.parent.parent.sound_on:
-            pygame.mixer.Sound.play(self.sound)
+        self.parent.parent.sounds.play("laser")
 
         return plist, momentum, energy
 
@@ -96,18 +93,16 @@ class HomingMissile(WeaponParent):
         """Initialize class."""
         super().__init__(
             fire_rate=0.5,
-            projectile_initial_velocity=20,
+            projectile_initial_velocity=600,
             projectile_mass=0,
             energy_cost=0,
             **kwargs
         )
 
-        self.sound = pygame.mixer.Sound("spaceshooter/Sounds/Weapons/missile.wav")
-
     @property
     def delta_time(self):
         """Return time delta."""
-        return 1.0 if self.parent is None or self.parent.parent.fps == 0 else 1.0 / self.parent.parent.fps
+        return 1.0 if self.parent is None or self.parent.parent is None else self.parent.parent.delta_time
 
     def set_level(self, level):
         """Set weapon level."""
@@ -141,7 +136,7 @@ class HomingMissile(WeaponParent):
         if self.cooldown > 0 or self.energy_cost > ship.energy:
             return plist, momentum, energy
         
-        self.cooldown = 1 / (self.fire_rate * self.delta_time)
+        self.start_cooldown()
 
         px0, py0 = ship.rect.center        
 
@@ -151,14 +146,14 @@ class HomingMissile(WeaponParent):
             px = px0 + (ship.radius + 30) * math.cos(a)
             py = py0 - (ship.radius + 30) * math.sin(a)
 
-            vx = self.projectile_initial_velocity / self.delta_time * math.cos(a)
-            vy = - self.projectile_initial_velocity / self.delta_time * math.sin(a)
+            vx = self.projectile_initial_velocity * math.cos(a)
+            vy = - self.projectile_initial_velocity * math.sin(a)
 
-            plist.append(projectiles.HomingMissileProjectile(
+            plist.append(projectiles.missile_pool.acquire(
                 parent=self,
                 name=f"Homing missile from {ship.name}",
                 mass=self.projectile_mass,
-                lifetime=2.5 / self.delta_time,
+                lifetime=2.5,
                 health=1,
                 height=10,
                 width=25,
@@ -166,12 +161,11 @@ class HomingMissile(WeaponParent):
                 position=[px, py],
                 velocity=[vx, vy],
                 angle=a,
-                velocity_drag=0.1
+                velocity_drag=0.95
             ))
 
             a += da
         
-        if self.parent.parent.sound_on:
-            pygame.mixer.Sound.play(self.sound)
+        self.parent.parent.sounds.play("missile")
 
         return plist, momentum, energy
@@ -0,0 +1,185 @@
+"""Definition of benchmark scenarios for the game loop."""
+import json
+import random
+import statistics
+import time
+import numpy as np
+import pygame
+
+import spaceshooter.helpers.misc_helpers as mh
+from spaceshooter.data_classes.enemy_classes import get_default_enemy
+
+def hold(*action_names):
+    """Return input provider holding the keys bound to the named player actions."""
+    def provider(game, player):
+        return mh.pressed_keys([k for k, action in player.control_dict.items() if action.__name__ in action_names])
+
+    return provider
+
+def max_weapon_levels(game):
+    """Set all player weapons to level 5."""
+    for p in game.players:
+        p.primary_weapon.set_level(5)
+        p.secondary_weapon.set_level(5)
+
+def add_ufo_grid(game, n, x0 = 150):
+    """Add n UFOs on a grid covering the screen to the right of x0."""
+    ncols = max(1, int(n ** 0.5))
+    nrows = (n + ncols - 1) // ncols
+    for ii in range(n):
+        x = x0 + (ii % ncols) * (game.screen_width - x0 - 50) // ncols
+        y = 50 + (ii // ncols) * (game.screen_height - 100) // nrows
+        game.add_enemy(get_default_enemy("Ufo", [x, y]))
+
+def setup_ufos(game):
+    """Scenario: 200 idle UFOs."""
+    add_ufo_grid(game, 200)
+
+def setup_lasers(game):
+    """Scenario: two ships with level 5 lasers firing constantly."""
+    max_weapon_levels(game)
+
+def setup_missiles(game):
+    """Scenario: two ships with level 5 homing missiles firing at 50 UFOs."""
+    max_weapon_levels(game)
+    add_ufo_grid(game, 50, game.screen_width // 2)
+
+# name: (setup function, input provider)
+SCENARIOS = {
+    "ufos": (setup_ufos, hold()),
+    "lasers_level5": (setup_lasers, hold("fire_primary")),
+    "missiles_saturated": (setup_missiles, hold("fire_secondary")),
+}
+
+def summarize(times):
+    """Return frame time statistics in milliseconds."""
+    ms = sorted(1000 * t for t in times)
+    n = len(ms)
+    return {
+        "mean": statistics.fmean(ms),
+        "median": statistics.median(ms),
+        "p95": ms[min(n - 1, int(0.95 * n))],
+        "p99": ms[min(n - 1, int(0.99 * n))],
+    }
+
+def run_scenario(game, name: str, nframes: int = 300, seed: int = 0, render: bool = True) -> dict:
+    """Run named scenario on a headless game and time on_loop and on_render."""
+    setup, provider = SCENARIOS[name]
+
+    random.seed(seed)
+    np.random.seed(seed)
+
+    game.nplayers = 2
+    game.input_provider = provider
+
+    # Keep wall-clock spawn and AI budgets from changing the workload with machine speed
+    game.deterministic = True
+    game.start_match()
+    setup(game)
+
+    loop_times = []
+    render_times = []
+    for _ in range(nframes):
+        pygame.event.pump()
+
+        t0 = time.perf_counter()
+        game.spawn_enemies()
+        game.on_loop()
+        t1 = time.perf_counter()
+        loop_times.append(t1 - t0)
+
+        if render:
+            game.on_render()
+            render_times.append(time.perf_counter() - t1)
+
+        game.profiler.end_frame()
+
+    results = {
+        "frames": nframes,
+        "seed": seed,
+        "sprites": len(game.all_sprites),
+        "loop": summarize(loop_times),
+    }
+    if render:
+        results["render"] = summarize(render_times)
+
+    game.reset()
+    game.input_provider = None
+
+    return results
+
+def check_dirty_render(game, nframes: int = 60, seed: int = 0) -> list:
+    """Render UFOs and lasers in dirty mode and return (frame, pixels) of frames differing from a full redraw.
+
+    After each partial redraw, everything not covered by a sprite or the
+    HUD this frame, both the patched regions and the background left from
+    the last full redraw around them, must match a full background redraw
+    pixel for pixel.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+
+    render_mode = game.render_mode
+    game.render_mode = "dirty"
+    game.nplayers = 2
+    game.input_provider = hold("fire_primary")
+    game.deterministic = True
+    game.start_match()
+    add_ufo_grid(game, 20, game.screen_width // 2)
+
+    w, h = game.screen_size
+    reference = pygame.Surface((w, h))
+    hud_rect = pygame.Rect(0, 0, w, game.hud.get_font().get_linesize())
+
+    mismatches = []
+    for _ in range(nframes):
+        pygame.event.pump()
+        game.spawn_enemies()
+        game.on_loop()
+
+        ndirty = game.dirty_rects.dirty_frames
+        game.on_render()
+        if game.dirty_rects.dirty_frames == ndirty:
+            continue
+
+        mask = np.ones((w, h), dtype=bool)
+        for r in game.dirty_rects.previous + [hud_rect]:
+            r = r.clip(reference.get_rect())
+            mask[r.left:r.right, r.top:r.bottom] = False
+
+        game.background.draw(reference)
+        differ = (pygame.surfarray.array3d(game.screen) != pygame.surfarray.array3d(reference)).any(axis=2)
+        npixels = int((differ & mask).sum())
+        if npixels > 0:
+            mismatches.append((game.render_frame, npixels))
+
+    game.reset()
+    game.input_provider = None
+    game.render_mode = render_mode
+
+    return mismatches
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """Return list of regressions where p95 frame time exceeds baseline by more than tolerance."""
+    regressions = []
+    for name, result in results.items():
+        for phase in ("loop", "render"):
+            if phase not in result or phase not in baseline.get(name, {}):
+                continue
+
+            old = baseline[name][phase]["p95"]
+            new = result[phase]["p95"]
+            if new > old * (1 + tolerance):
+                regressions.append(f"{name} {phase}: p95 {new:.2f} ms vs baseline {old:.2f} ms")
+
+    return regressions
+
+def load_json(filepath: str) -> dict:
+    """Load JSON file."""
+    with open(filepath) as f:
+        return json.load(f)
+
+def save_json(data: dict, filepath: str):
+    """Save JSON file."""
+    with open(filepath, "w") as f:
+        json.dump(data, f, indent=4)
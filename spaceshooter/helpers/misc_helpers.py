@@ -1,18 +1,108 @@
 """Definition for miscellaneous helper functions."""
+import math
 import sys
+from collections import defaultdict
 import pygame
 
-def rot_center(image, angle, x, y):
-    """Rotate image around center."""
-    
-    rotated_image = pygame.transform.rotate(image, angle)
-    new_rect = rotated_image.get_rect(center = image.get_rect(center = (x, y)).center)
+def pressed_keys(keys):
+    """Return key states with keys pressed, usable in place of pygame.key.get_pressed()."""
+    return defaultdict(bool, {k: True for k in keys})
+
+def scripted_input(game, player):
+    """Scripted player input: fire everything and sweep up and down."""
+    actions = {action.__name__: key for key, action in player.control_dict.items()}
+    keys = [actions[a] for a in ("fire_primary", "fire_secondary") if a in actions]
+
+    move = "move_up" if (game.frame // game.tick_rate) % 2 == 0 else "move_down"
+    if move in actions:
+        keys.append(actions[move])
 
-    return rotated_image, new_rect
+    return pressed_keys(keys)
 
 def collide_if_not_self(sprite1, sprite2):
     """Detect collision between unequal sprites."""
     if sprite1 == sprite2:
         return False
     
-    return pygame.sprite.collide_mask(sprite1, sprite2)
+    return collide_tiered(sprite1, sprite2)
+
+def bounding_radius(sprite):
+    """Return radius of circle enclosing the sprite's collision shape."""
+    if sprite.collision_shape == "circle":
+        return sprite.radius
+
+    return max(sprite.radius, 0.5 * math.hypot(sprite.width, sprite.height))
+
+def obb_axes(sprite):
+    """Return unit axes of the sprite's oriented box in screen coordinates."""
+    a = getattr(sprite, "angle", 0)
+    c = math.cos(a)
+    s = math.sin(a)
+
+    return (c, -s), (s, c)
+
+def collide_circle_obb(circle, box):
+    """Detect collision between a circle sprite and an oriented box sprite."""
+    cx, cy = circle.rect.center
+    bx, by = box.rect.center
+    dx = cx - bx
+    dy = cy - by
+
+    # Closest point on box to circle center, in box coordinates
+    (ux, uy), (vx, vy) = obb_axes(box)
+    du = max(-box.width / 2, min(box.width / 2, dx * ux + dy * uy))
+    dv = max(-box.height / 2, min(box.height / 2, dx * vx + dy * vy))
+
+    ex = dx - du * ux - dv * vx
+    ey = dy - du * uy - dv * vy
+
+    return ex * ex + ey * ey <= circle.radius * circle.radius
+
+def collide_obb(sprite1, sprite2):
+    """Detect collision between two oriented box sprites (separating axis test)."""
+    x1, y1 = sprite1.rect.center
+    x2, y2 = sprite2.rect.center
+    dx = x2 - x1
+    dy = y2 - y1
+
+    u1, v1 = obb_axes(sprite1)
+    u2, v2 = obb_axes(sprite2)
+    hw1, hh1 = sprite1.width / 2, sprite1.height / 2
+    hw2, hh2 = sprite2.width / 2, sprite2.height / 2
+
+    for ax, ay in (u1, v1, u2, v2):
+        r1 = hw1 * abs(u1[0] * ax + u1[1] * ay) + hh1 * abs(v1[0] * ax + v1[1] * ay)
+        r2 = hw2 * abs(u2[0] * ax + u2[1] * ay) + hh2 * abs(v2[0] * ax + v2[1] * ay)
+        if abs(dx * ax + dy * ay) > r1 + r2:
+            return False
+
+    return True
+
+def collide_tiered(sprite1, sprite2):
+    """Detect collision using the cheapest test both sprites allow.
+
+    Bounding circles are checked first. Circle pairs are settled there,
+    boxes go on to a separating axis test and pixel masks are only
+    compared when one of the sprites has collision_shape "mask".
+    """
+    x1, y1 = sprite1.rect.center
+    x2, y2 = sprite2.rect.center
+    r = bounding_radius(sprite1) + bounding_radius(sprite2)
+    if (x2 - x1) ** 2 + (y2 - y1) ** 2 > r * r:
+        return False
+
+    shape1 = sprite1.collision_shape
+    shape2 = sprite2.collision_shape
+    if shape1 == "mask" or shape2 == "mask":
+        return pygame.sprite.collide_mask(sprite1, sprite2) is not None
+
+    if shape1 == "circle" and shape2 == "circle":
+        return True
+
+    if shape1 == "circle":
+        return collide_circle_obb(sprite1, sprite2)
+
+    if shape2 == "circle":
+        return collide_circle_obb(sprite2, sprite1)
+
+    return collide_obb(sprite1, sprite2)
@@ -0,0 +1,143 @@
+"""Definition of batch simulation helpers for balance and load sweeps."""
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pygame
+
+import spaceshooter.helpers.misc_helpers as mh
+import spaceshooter.helpers.benchmark_helpers as bh
+from spaceshooter.data_classes.game_classes import SpaceshooterGame
+
+# One headless game per worker process, reused across runs
+_game = None
+
+def bot_input(game, player):
+    """Bot player input: line up with the nearest enemy, fire everything and back off when it gets close."""
+    actions = {action.__name__: key for key, action in player.control_dict.items()}
+    keys = [actions[a] for a in ("fire_primary", "fire_secondary") if a in actions]
+
+    x, y = player.rect.center
+    enemies = [e for e in game.enemies if e.rect.centerx > x]
+    if enemies:
+        target = min(enemies, key=lambda e: abs(e.rect.centery - y) + abs(e.rect.centerx - x))
+        dy = target.rect.centery - y
+        if abs(dy) > player.height // 2:
+            keys.append(actions.get("move_down" if dy > 0 else "move_up"))
+
+        if target.rect.centerx - x < 200:
+            keys.append(actions.get("move_left"))
+
+    return mh.pressed_keys(k for k in keys if k is not None)
+
+INPUTS = {
+    "bot": bot_input,
+    "scripted": mh.scripted_input,
+}
+
+def parameter_grid(params: dict, seeds: int = 1) -> list:
+    """Return one config per combination of the listed parameter values and seed."""
+    names = list(params)
+    configs = []
+    for values in itertools.product(*(params[n] for n in names)):
+        for seed in range(seeds):
+            configs.append(dict(zip(names, values), seed=seed))
+
+    return configs
+
+def get_game():
+    """Return this process' headless game, creating it on first use."""
+    global _game
+    if _game is None:
+        _game = SpaceshooterGame(headless=True)
+
+    return _game
+
+def run_simulation(config: dict) -> dict:
+    """Play one headless match described by config and return its metrics.
+
+    Recognized keys are seed, frames, players, enemies (initial enemy
+    count), enemy_rate, weapon_level, input ("bot" or "scripted") and
+    render. The match ends after frames ticks or when all players are dead.
+    """
+    game = get_game()
+    nframes = config.get("frames", 1800)
+    render = config.get("render", False)
+
+    seed = config.get("seed", 0)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    game.nplayers = config.get("players", 2)
+    game.nenemies = config.get("enemies", 3)
+    game.enemy_rate = config.get("enemy_rate", 0.5)
+    game.input_provider = INPUTS[config.get("input", "bot")]
+
+    # Keep wall-clock spawn and AI budgets from changing the workload with machine speed
+    game.deterministic = True
+    game.start_match()
+    ships = game.players.sprites()
+
+    level = config.get("weapon_level")
+    if level is not None:
+        for p in ships:
+            p.primary_weapon.set_level(level)
+            p.secondary_weapon.set_level(level)
+
+    times = []
+    peak_sprites = 0
+    survival = None
+    for _ in range(nframes):
+        pygame.event.pump()
+
+        t0 = time.perf_counter()
+        game.spawn_enemies()
+        game.on_loop()
+        if render:
+            game.on_render()
+        times.append(time.perf_counter() - t0)
+
+        game.profiler.end_frame()
+
+        peak_sprites = max(peak_sprites, len(game.all_sprites) + len(game.explosions))
+        if len(game.players) == 0:
+            survival = game.gametime
+            break
+
+    frame_ms = bh.summarize(times)
+    results = dict(config)
+    results.update({
+        "frames_run": len(times),
+        "score": sum(p.score for p in ships),
+        "survival": game.gametime if survival is None else survival,
+        "survived": survival is None,
+        "peak_sprites": peak_sprites,
+        "frame_mean": frame_ms["mean"],
+        "frame_p99": frame_ms["p99"],
+        "pid": os.getpid(),
+    })
+
+    game.reset()
+    game.input_provider = None
+
+    return results
+
+def run_sweep(configs: list, workers: int|None = None) -> list:
+    """Run configs across a pool of worker processes and return results in config order."""
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        return [run_simulation(c) for c in configs]
+
+    chunksize = max(1, len(configs) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_simulation, configs, chunksize=chunksize))
+
+def to_columns(rows: list) -> dict:
+    """Convert list of result dicts to a dict of equal length columns."""
+    names = []
+    for row in rows:
+        names += [n for n in row if n not in names]
+
+    return {n: [row.get(n) for row in rows] for n in names}
@@ -0,0 +1,38 @@
+import argparse
+import json
+import time
+
+import spaceshooter.helpers.benchmark_helpers as bh
+import spaceshooter.helpers.sweep_helpers as sh
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a grid of headless Spaceshooter matches across all cores")
+    parser.add_argument("--seeds", type=int, default=4, help="seeds per parameter combination")
+    parser.add_argument("--frames", type=int, default=1800, help="maximum simulation ticks per match")
+    parser.add_argument("--players", type=int, nargs="+", default=[2], help="player counts")
+    parser.add_argument("--enemies", type=int, nargs="+", default=[3], help="initial enemy counts")
+    parser.add_argument("--enemy-rate", type=float, nargs="+", default=[0.5], help="enemy spawn rates per second")
+    parser.add_argument("--weapon-level", type=int, nargs="+", default=[1], help="starting weapon levels")
+    parser.add_argument("--input", choices=list(sh.INPUTS), default="bot", help="player input")
+    parser.add_argument("--render", action="store_true", help="also draw every frame")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default="sweep_results.json", help="columnar JSON result file")
+    args = parser.parse_args()
+
+    params = {
+        "players": args.players,
+        "enemies": args.enemies,
+        "enemy_rate": args.enemy_rate,
+        "weapon_level": args.weapon_level,
+    }
+    configs = sh.parameter_grid(params, args.seeds)
+    for c in configs:
+        c.update(frames=args.frames, input=args.input, render=args.render)
+
+    t0 = time.perf_counter()
+    rows = sh.run_sweep(configs, args.workers)
+    seconds = time.perf_counter() - t0
+
+    bh.save_json(sh.to_columns(rows), args.output)
+    print(json.dumps(rows[:3], indent=4))
+    print(f"Ran {len(rows)} matches in {seconds:.1f} s, results written to {args.output}")